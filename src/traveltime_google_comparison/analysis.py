@@ -1,7 +1,10 @@
 import logging
 from dataclasses import dataclass
+from typing import List, Optional
 
-from pandas import DataFrame
+import numpy as np
+import pandas as pd
+from pandas import DataFrame, Series
 
 from traveltime_google_comparison.collect import (
     Fields,
@@ -9,6 +12,13 @@ from traveltime_google_comparison.collect import (
     get_capitalized_provider_name,
 )
 from traveltime_google_comparison.config import Providers
+from traveltime_google_comparison.database import RunInfo, append_run
+from traveltime_google_comparison.geo import haversine_km, parse_coordinates_column
+
+PROVIDER = "provider"
+DISTANCE_BAND = "distance_band"
+TIME_BAND = "time_band"
+RELATIVE_ERROR = "relative_error"
 
 
 def absolute_error(api_provider: str) -> str:
@@ -58,12 +68,58 @@ def format_results_for_csv(
     return formatted_results
 
 
+def log_band_statistics(band_statistics: DataFrame, quantile: float):
+    band_columns = [
+        column for column in (DISTANCE_BAND, TIME_BAND) if column in band_statistics
+    ]
+    for row in band_statistics.to_dict("records"):
+        capitalized_provider = get_capitalized_provider_name(row[PROVIDER])
+        bands = ", ".join(format_band(row[column], column) for column in band_columns)
+        logging.info(
+            f"{capitalized_provider} API, {bands}: mean relative error {row['mean']:.2f}%, "
+            f"{int(quantile * 100)}% of results differ by less than {int(row['quantile'])}% "
+            f"({row['count']} rows)"
+        )
+
+
+def format_band(band: pd.Interval, column: str) -> str:
+    unit = "km" if column == DISTANCE_BAND else "h"
+    return f"{band.left:g}-{band.right:g} {unit}"
+
+
 def run_analysis(
-    results: DataFrame, output_file: str, quantile: float, api_providers: Providers
+    results: DataFrame,
+    output_file: str,
+    quantile: float,
+    api_providers: Providers,
+    distance_bands: Optional[List[float]] = None,
+    time_bands: Optional[List[float]] = None,
+    bands_output_file: Optional[str] = None,
+    database_file: Optional[str] = None,
+    run: Optional[RunInfo] = None,
 ):
     results_with_differences = calculate_differences(results, api_providers)
     log_results(results_with_differences, quantile, api_providers)
 
+    if database_file is not None and run is not None:
+        append_run(
+            database_file,
+            to_long_results(results_with_differences, api_providers),
+            run,
+        )
+
+    if distance_bands is not None or time_bands is not None:
+        band_statistics = calculate_band_statistics(
+            results_with_differences,
+            quantile,
+            api_providers,
+            distance_bands,
+            time_bands,
+        )
+        log_band_statistics(band_statistics, quantile)
+        if bands_output_file is not None:
+            band_statistics.to_csv(bands_output_file, index=False)
+
     logging.info(f"Detailed results can be found in {output_file} file")
 
     formatted_results = format_results_for_csv(results_with_differences, api_providers)
@@ -93,6 +149,32 @@ def calculate_differences(results: DataFrame, api_providers: Providers) -> DataF
     return results_with_differences
 
 
+def to_long_results(
+    results_with_differences: DataFrame, api_providers: Providers
+) -> DataFrame:
+    """One row per pair, departure time and competitor, as stored in the database."""
+    long_results = []
+    for provider in api_providers.competitors:
+        provider_results = results_with_differences[
+            [Fields.ORIGIN, Fields.DESTINATION, Fields.DEPARTURE_TIME]
+        ].copy()
+        provider_results[PROVIDER] = provider.name
+        provider_results["travel_time"] = results_with_differences[
+            Fields.TRAVEL_TIME[provider.name]
+        ]
+        provider_results["traveltime_travel_time"] = results_with_differences[
+            Fields.TRAVEL_TIME[TRAVELTIME_API]
+        ]
+        provider_results["absolute_error"] = results_with_differences[
+            absolute_error(provider.name)
+        ]
+        provider_results[RELATIVE_ERROR] = results_with_differences[
+            relative_error(provider.name)
+        ]
+        long_results.append(provider_results)
+    return pd.concat(long_results, ignore_index=True)
+
+
 def calculate_quantiles(
     results_with_differences: DataFrame,
     quantile: float,
@@ -107,3 +189,57 @@ def calculate_quantiles(
     return QuantileErrorResult(
         int(quantile_absolute_error), int(quantile_relative_error)
     )
+
+
+def calculate_distances(results: DataFrame) -> np.ndarray:
+    origin_lat, origin_lng = parse_coordinates_column(results[Fields.ORIGIN])
+    destination_lat, destination_lng = parse_coordinates_column(
+        results[Fields.DESTINATION]
+    )
+    return haversine_km(origin_lat, origin_lng, destination_lat, destination_lng)
+
+
+def departure_hours(departure_times: Series) -> np.ndarray:
+    # Departure times are local `YYYY-MM-DD HH:MM:SS±HHMM` strings,
+    # so the time of day can be sliced out without timezone conversions
+    hours = departure_times.str.slice(11, 13).astype(int).to_numpy()
+    minutes = departure_times.str.slice(14, 16).astype(int).to_numpy()
+    return hours + minutes / 60
+
+
+def calculate_band_statistics(
+    results_with_differences: DataFrame,
+    quantile: float,
+    api_providers: Providers,
+    distance_bands: Optional[List[float]],
+    time_bands: Optional[List[float]],
+) -> DataFrame:
+    bands = DataFrame(index=results_with_differences.index)
+    if distance_bands is not None:
+        bands[DISTANCE_BAND] = pd.cut(
+            calculate_distances(results_with_differences), distance_bands, right=False
+        )
+    if time_bands is not None:
+        bands[TIME_BAND] = pd.cut(
+            departure_hours(results_with_differences[Fields.DEPARTURE_TIME]),
+            time_bands,
+            right=False,
+        )
+    band_columns = list(bands.columns)
+
+    errors = results_with_differences[
+        [relative_error(provider.name) for provider in api_providers.competitors]
+    ]
+    errors.columns = [provider.name for provider in api_providers.competitors]
+
+    # Long format lets one groupby cover every provider and band at once
+    long_errors = pd.concat([bands, errors], axis=1).melt(
+        id_vars=band_columns, var_name=PROVIDER, value_name=RELATIVE_ERROR
+    )
+    grouped = long_errors.groupby([PROVIDER] + band_columns, observed=True, sort=False)[
+        RELATIVE_ERROR
+    ]
+    band_statistics = grouped.agg(["count", "mean"])
+    band_statistics["quantile"] = grouped.quantile(quantile, interpolation="higher")
+
+    return band_statistics.reset_index().sort_values([PROVIDER] + band_columns)
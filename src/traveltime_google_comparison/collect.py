@@ -1,45 +1,64 @@
 import asyncio
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from collections import Counter, OrderedDict
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
 
+import numpy as np
 import pandas as pd
 import pytz
 from pandas import DataFrame
 from pytz.tzinfo import BaseTzInfo
 from traveltimepy import Coordinates
 
+from traveltime_google_comparison import profiling
 from traveltime_google_comparison.config import Mode
-from traveltime_google_comparison.requests.base_handler import BaseRequestHandler
+from traveltime_google_comparison.geo import parse_coordinates_column
+from traveltime_google_comparison.requests.base_handler import (
+    BaseRequestHandler,
+    RequestResult,
+)
+from traveltime_google_comparison.requests.registry import (  # noqa: F401 re-exported
+    GOOGLE_API,
+    TOMTOM_API,
+    HERE_API,
+    OSRM_API,
+    MAPBOX_API,
+    TRAVELTIME_API,
+    OPENROUTES_API,
+    get_provider_spec,
+    registered_providers,
+)
 
 
-GOOGLE_API = "google"
-TOMTOM_API = "tomtom"
-HERE_API = "here"
-OSRM_API = "osrm"
-MAPBOX_API = "mapbox"
-TRAVELTIME_API = "traveltime"
-OPENROUTES_API = "openroutes"
+def get_capitalized_provider_name(provider: str) -> str:
+    return get_provider_spec(provider).display_name
 
 
-def get_capitalized_provider_name(provider: str) -> str:
-    if provider == "google":
-        return "Google"
-    elif provider == "tomtom":
-        return "TomTom"
-    elif provider == "here":
-        return "HERE"
-    elif provider == "osrm":
-        return "OSRM"
-    elif provider == "openroutes":
-        return "OpenRoutes"
-    elif provider == "mapbox":
-        return "Mapbox"
-    elif provider == "traveltime":
-        return "TravelTime"
-    else:
-        raise ValueError(f"Unsupported API provider: {provider}")
+class TravelTimeColumns(Mapping[str, str]):
+    """Output column of every registered provider, keyed by provider name."""
+
+    def __getitem__(self, provider: str) -> str:
+        return get_provider_spec(provider).output_column
+
+    def __iter__(self) -> Iterator[str]:
+        return iter([spec.name for spec in registered_providers()])
+
+    def __len__(self) -> int:
+        return len(registered_providers())
 
 
 @dataclass
@@ -47,42 +66,288 @@ class Fields:
     ORIGIN = "origin"
     DESTINATION = "destination"
     DEPARTURE_TIME = "departure_time"
-    TRAVEL_TIME = {
-        GOOGLE_API: "google_travel_time",
-        TOMTOM_API: "tomtom_travel_time",
-        HERE_API: "here_travel_time",
-        OSRM_API: "osrm_travel_time",
-        MAPBOX_API: "mapbox_travel_time",
-        OPENROUTES_API: "openroutes_travel_time",
-        TRAVELTIME_API: "tt_travel_time",
-    }
+    TRAVEL_TIME = TravelTimeColumns()
+
+
+# Numeric coordinates carried by compiled inputs next to the text columns
+COORDINATE_COLUMNS = ["origin_lat", "origin_lng", "destination_lat", "destination_lng"]
 
 
 logger = logging.getLogger(__name__)
 
 
+class ResultStore:
+    """
+    Preallocated travel times for every (pair, departure time, provider) key.
+    Responses are written in place, so no per-result objects are kept around.
+    """
+
+    def __init__(
+        self,
+        pairs: DataFrame,
+        time_instants: List[datetime],
+        provider_names: List[str],
+    ):
+        self.pairs = pairs
+        self.time_instants = time_instants
+        self.provider_names = provider_names
+        self._provider_indices = {
+            provider: index for index, provider in enumerate(provider_names)
+        }
+        self._time_invariant = {
+            provider
+            for provider in provider_names
+            if not get_provider_spec(provider).time_dependent
+        }
+
+        shape = (len(pairs), len(time_instants), len(provider_names))
+        self.travel_times = np.zeros(shape, dtype=np.int32)
+        self.missing = np.ones(shape, dtype=bool)
+
+    def set(
+        self,
+        pair_index: int,
+        time_index: int,
+        provider: str,
+        travel_time: Optional[int],
+    ):
+        if travel_time is None:
+            return
+        provider_index = self._provider_indices[provider]
+        if provider in self._time_invariant:
+            # The same travel time holds for every departure time of the pair
+            self.travel_times[pair_index, :, provider_index] = travel_time
+            self.missing[pair_index, :, provider_index] = False
+        else:
+            self.travel_times[pair_index, time_index, provider_index] = travel_time
+            self.missing[pair_index, time_index, provider_index] = False
+
+    def complete(self, providers: Iterable[str]) -> np.ndarray:
+        """(pairs, departure times) mask of the keys every one of `providers` has a travel time for."""
+        indices = [self._provider_indices[provider] for provider in providers]
+        return np.logical_not(self.missing[:, :, indices].any(axis=2))
+
+    def has_result(self, pair_index: int, provider: str) -> bool:
+        """Whether any departure time of the pair has a travel time from the provider."""
+        provider_index = self._provider_indices[provider]
+        return not self.missing[pair_index, :, provider_index].all()
+
+    def to_dataframe(self, requested: Optional[np.ndarray] = None) -> DataFrame:
+        """`requested` is a (pairs, departure times) mask of the rows to keep, all by default."""
+        pairs_count, times_count, _ = self.travel_times.shape
+        departure_times = [
+            time_instant.strftime("%Y-%m-%d %H:%M:%S%z")
+            for time_instant in self.time_instants
+        ]
+
+        results = DataFrame(
+            {
+                Fields.ORIGIN: np.repeat(
+                    self.pairs[Fields.ORIGIN].to_numpy(), times_count
+                ),
+                Fields.DESTINATION: np.repeat(
+                    self.pairs[Fields.DESTINATION].to_numpy(), times_count
+                ),
+                Fields.DEPARTURE_TIME: np.tile(departure_times, pairs_count),
+            }
+        )
+        for provider, provider_index in self._provider_indices.items():
+            # Arrays are C-ordered, so flattening keeps the pair-major row order above
+            results[Fields.TRAVEL_TIME[provider]] = pd.arrays.IntegerArray(
+                self.travel_times[:, :, provider_index].reshape(-1),
+                self.missing[:, :, provider_index].reshape(-1),
+            )
+        if requested is not None:
+            results = results[requested.reshape(-1)].reset_index(drop=True)
+        return results
+
+
+CacheKey = Tuple[str, Mode, float, float, float, float, datetime]
+
+
+class ResultCache:
+    """
+    In-memory LRU of provider responses.
+    Concurrent lookups of a key that is still being fetched wait for that request
+    instead of sending their own. Failed requests are not kept.
+    """
+
+    def __init__(self, max_size: int = 100_000):
+        self.max_size = max_size
+        self.hits = 0
+        self._results: "OrderedDict[CacheKey, asyncio.Future]" = OrderedDict()
+
+    @staticmethod
+    def key(
+        api: str,
+        mode: Mode,
+        origin: Coordinates,
+        destination: Coordinates,
+        departure_time: datetime,
+    ) -> CacheKey:
+        return (
+            api,
+            mode,
+            origin.lat,
+            origin.lng,
+            destination.lat,
+            destination.lng,
+            departure_time,
+        )
+
+    def __contains__(self, key: CacheKey) -> bool:
+        return key in self._results
+
+    async def get_or_fetch(
+        self, key: CacheKey, fetch: Callable[[], Awaitable[RequestResult]]
+    ) -> RequestResult:
+        future = self._results.get(key)
+        if future is not None:
+            self._results.move_to_end(key)
+            self.hits += 1
+            return await future
+
+        future = asyncio.get_running_loop().create_future()
+        self._add(key, future)
+        try:
+            result = await fetch()
+        except BaseException:
+            self._results.pop(key, None)
+            future.set_result(RequestResult(None))
+            raise
+
+        if result.travel_time is None:
+            self._results.pop(key, None)
+        future.set_result(result)
+        return result
+
+    def put(self, key: CacheKey, result: RequestResult):
+        if result.travel_time is None:
+            return
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(result)
+        self._add(key, future)
+
+    def _add(self, key: CacheKey, future: asyncio.Future):
+        self._results[key] = future
+        self._results.move_to_end(key)
+        if len(self._results) > self.max_size:
+            self._results.popitem(last=False)
+
+
+class DepartureDeadlines:
+    """
+    Tracks providers which reject departure times in the past,
+    so requests whose departure time has already passed are skipped instead of sent.
+    """
+
+    def __init__(self, provider_names: Iterable[str]):
+        self._providers = {
+            name
+            for name in provider_names
+            if get_provider_spec(name).rejects_past_departures
+        }
+        self._expired: Set[Tuple[str, datetime]] = set()
+        self.skipped = 0
+
+    def expired(self, api: str, departure_time: datetime) -> bool:
+        if api not in self._providers:
+            return False
+        if departure_time > datetime.now(departure_time.tzinfo):
+            return False
+
+        self.skipped += 1
+        if (api, departure_time) not in self._expired:
+            self._expired.add((api, departure_time))
+            logger.warning(
+                f"{get_capitalized_provider_name(api)} API rejects past departure times, "
+                f"skipping requests departing at {departure_time}"
+            )
+        return True
+
+
+async def acquire(request_handler: BaseRequestHandler) -> bool:
+    """Waits for the handler's rate limiter and circuit breaker, False to skip the request."""
+    with profiling.stage(profiling.LIMITER_WAIT):
+        if request_handler.circuit_breaker is None:
+            await request_handler.rate_limiter.acquire()
+            return True
+        return await request_handler.circuit_breaker.acquire(
+            request_handler.rate_limiter
+        )
+
+
 async def fetch_travel_time(
-    origin: str,
-    destination: str,
+    pair_index: int,
+    time_index: int,
+    origin: Coordinates,
+    destination: Coordinates,
     api: str,
     departure_time: datetime,
     request_handler: BaseRequestHandler,
     mode: Mode,
-) -> Dict[str, str]:
-    origin_coord = parse_coordinates(origin)
-    destination_coord = parse_coordinates(destination)
-
-    async with request_handler.rate_limiter:
+    store: ResultStore,
+    cache: ResultCache,
+    deadlines: DepartureDeadlines,
+):
+    async def send_request() -> RequestResult:
+        if deadlines.expired(api, departure_time):
+            return RequestResult(None)
+        if not await acquire(request_handler):
+            return RequestResult(None)
         logger.debug(
-            f"Sending request to {api} for {origin_coord}, {destination_coord}, {departure_time}"
+            f"Sending request to {api} for {origin}, {destination}, {departure_time}"
         )
         result = await request_handler.send_request(
-            origin_coord, destination_coord, departure_time, mode
+            origin, destination, departure_time, mode
         )
         logger.debug(
-            f"Finished request to {api} for {origin_coord}, {destination_coord}, {departure_time}"
+            f"Finished request to {api} for {origin}, {destination}, {departure_time}"
+        )
+        if request_handler.circuit_breaker is not None:
+            request_handler.circuit_breaker.record(result.failed)
+        return result
+
+    key = ResultCache.key(api, mode, origin, destination, departure_time)
+    result = await cache.get_or_fetch(key, send_request)
+    store.set(pair_index, time_index, api, result.travel_time)
+
+
+async def fetch_travel_times_batch(
+    pair_indices: Sequence[int],
+    time_index: int,
+    origins: List[Coordinates],
+    destinations: List[Coordinates],
+    api: str,
+    departure_time: datetime,
+    request_handler: BaseRequestHandler,
+    mode: Mode,
+    store: ResultStore,
+    cache: ResultCache,
+    deadlines: DepartureDeadlines,
+):
+    if deadlines.expired(api, departure_time):
+        return
+    if not await acquire(request_handler):
+        return
+    logger.debug(
+        f"Sending batch request to {api} for {len(pair_indices)} pairs, {departure_time}"
+    )
+    results = await request_handler.send_batch_request(
+        origins, destinations, departure_time, mode
+    )
+    logger.debug(
+        f"Finished batch request to {api} for {len(pair_indices)} pairs, {departure_time}"
+    )
+    if request_handler.circuit_breaker is not None:
+        request_handler.circuit_breaker.record(all(result.failed for result in results))
+    for pair_index, origin, destination, result in zip(
+        pair_indices, origins, destinations, results
+    ):
+        store.set(pair_index, time_index, api, result.travel_time)
+        cache.put(
+            ResultCache.key(api, mode, origin, destination, departure_time), result
         )
-        return wrap_result(origin, destination, result.travel_time, departure_time, api)
 
 
 def parse_coordinates(coord_string: str) -> Coordinates:
@@ -90,19 +355,30 @@ def parse_coordinates(coord_string: str) -> Coordinates:
     return Coordinates(lat=float(lat), lng=float(lng))
 
 
-def wrap_result(
-    origin: str,
-    destination: str,
-    travel_time: Optional[int],
-    departure_time: datetime,
-    api: str,
-):
-    return {
-        Fields.ORIGIN: origin,
-        Fields.DESTINATION: destination,
-        Fields.DEPARTURE_TIME: departure_time.strftime("%Y-%m-%d %H:%M:%S%z"),
-        Fields.TRAVEL_TIME[api]: travel_time,
-    }
+def parse_coordinates_list(coordinates: pd.Series) -> List[Coordinates]:
+    return to_coordinates_list(*parse_coordinates_column(coordinates))
+
+
+def to_coordinates_list(lat: np.ndarray, lng: np.ndarray) -> List[Coordinates]:
+    return [Coordinates(lat=lat, lng=lng) for lat, lng in zip(lat, lng)]
+
+
+def parse_pair_coordinates(
+    data: DataFrame,
+) -> Tuple[List[Coordinates], List[Coordinates]]:
+    """Uses the numeric columns of compiled inputs when present, instead of parsing the text."""
+    if set(COORDINATE_COLUMNS).issubset(data.columns):
+        origin_lat, origin_lng, destination_lat, destination_lng = (
+            data[column].to_numpy() for column in COORDINATE_COLUMNS
+        )
+        return (
+            to_coordinates_list(origin_lat, origin_lng),
+            to_coordinates_list(destination_lat, destination_lng),
+        )
+    return (
+        parse_coordinates_list(data[Fields.ORIGIN]),
+        parse_coordinates_list(data[Fields.DESTINATION]),
+    )
 
 
 def localize_datetime(date: str, time: str, timezone: BaseTzInfo) -> datetime:
@@ -110,56 +386,303 @@ def localize_datetime(date: str, time: str, timezone: BaseTzInfo) -> datetime:
     return timezone.localize(datetime_instance)
 
 
+def batch_pairs(
+    origins: List[Coordinates], batch_size: int, one_to_many: bool
+) -> List[List[int]]:
+    """
+    Splits pair indices into batches of at most `batch_size` pairs.
+    Pairs sharing an origin are kept next to each other, so they end up in the same
+    batch. One-to-many batches never mix origins.
+    """
+    groups: Dict[Tuple[float, float], List[int]] = {}
+    for pair_index, origin in enumerate(origins):
+        groups.setdefault((origin.lat, origin.lng), []).append(pair_index)
+
+    if one_to_many:
+        ordered_groups = list(groups.values())
+    else:
+        ordered_groups = [[index for group in groups.values() for index in group]]
+
+    batches = []
+    for group in ordered_groups:
+        for start in range(0, len(group), batch_size):
+            end = start + batch_size
+            batches.append(group[start:end])
+    return batches
+
+
 def generate_tasks(
     data: DataFrame,
     time_instants: List[datetime],
     request_handlers: Dict[str, BaseRequestHandler],
     mode: Mode,
+    store: ResultStore,
+    cache: ResultCache,
+    deadlines: DepartureDeadlines,
+) -> list:
+    # Coordinates are parsed once per pair rather than once per request
+    origins, destinations = parse_pair_coordinates(data)
+    return generate_pair_tasks(
+        origins,
+        destinations,
+        time_instants,
+        request_handlers,
+        mode,
+        store,
+        cache,
+        deadlines,
+    )
+
+
+def generate_pair_tasks(
+    origins: List[Coordinates],
+    destinations: List[Coordinates],
+    time_instants: List[datetime],
+    request_handlers: Dict[str, BaseRequestHandler],
+    mode: Mode,
+    store: ResultStore,
+    cache: ResultCache,
+    deadlines: DepartureDeadlines,
+    pairs_per_time: Optional[Sequence[Sequence[int]]] = None,
 ) -> list:
+    """
+    Tasks for every pair at every departure time, or only for `pairs_per_time[time_index]`
+    pair indices if set.
+    """
+
+    def provider_batches(api: str, pairs: Sequence[int]) -> List[List[int]]:
+        spec = get_provider_spec(api)
+        batches = batch_pairs(
+            [origins[index] for index in pairs],
+            spec.batch_size(mode),
+            spec.one_to_many,
+        )
+        return [[pairs[position] for position in batch] for batch in batches]
+
+    all_pairs = range(len(origins))
+    batches_of_all_pairs = {
+        api: provider_batches(api, all_pairs)
+        for api in request_handlers
+        if pairs_per_time is None and get_provider_spec(api).time_dependent
+    }
+    # Time-invariant providers get every pair once, at its first departure time,
+    # and the store broadcasts the result to the other departure times
+    invariant_requested: Dict[str, Set[int]] = {api: set() for api in request_handlers}
+
+    # Tasks are ordered by departure time, so every provider's rate limiter
+    # works through the earliest departures first.
     tasks = []
-    for index, row in data.iterrows():
-        for time_instant in time_instants:
-            for api, request_handler in request_handlers.items():
-                task = fetch_travel_time(
-                    row[Fields.ORIGIN],
-                    row[Fields.DESTINATION],
-                    api,
-                    time_instant,
-                    request_handler,
-                    mode=mode,
-                )
+    for time_index, time_instant in enumerate(time_instants):
+        pairs = all_pairs if pairs_per_time is None else pairs_per_time[time_index]
+        for api, request_handler in request_handlers.items():
+            if api in batches_of_all_pairs:
+                batches = batches_of_all_pairs[api]
+            elif get_provider_spec(api).time_dependent:
+                batches = provider_batches(api, pairs)
+            else:
+                requested = invariant_requested[api]
+                new_pairs = [
+                    pair_index
+                    for pair_index in pairs
+                    if pair_index not in requested
+                    and not store.has_result(pair_index, api)
+                ]
+                requested.update(new_pairs)
+                batches = provider_batches(api, new_pairs)
+            for batch in batches:
+                if len(batch) == 1:
+                    task = fetch_travel_time(
+                        batch[0],
+                        time_index,
+                        origins[batch[0]],
+                        destinations[batch[0]],
+                        api,
+                        time_instant,
+                        request_handler,
+                        mode=mode,
+                        store=store,
+                        cache=cache,
+                        deadlines=deadlines,
+                    )
+                else:
+                    task = fetch_travel_times_batch(
+                        batch,
+                        time_index,
+                        [origins[index] for index in batch],
+                        [destinations[index] for index in batch],
+                        api,
+                        time_instant,
+                        request_handler,
+                        mode=mode,
+                        store=store,
+                        cache=cache,
+                        deadlines=deadlines,
+                    )
                 tasks.append(task)
     return tasks
 
 
+def dispatch_phases(
+    request_handlers: Dict[str, BaseRequestHandler], cost_ordered: bool
+) -> List[Dict[str, BaseRequestHandler]]:
+    """
+    Providers grouped into phases sent one after another. With cost-ordered dispatch,
+    TravelTime and the free providers go first and the paid providers after them.
+    """
+    if not cost_ordered:
+        return [request_handlers]
+    free = {
+        api: handler
+        for api, handler in request_handlers.items()
+        if api == TRAVELTIME_API or not get_provider_spec(api).paid
+    }
+    paid = {
+        api: handler for api, handler in request_handlers.items() if api not in free
+    }
+    return [phase for phase in (free, paid) if phase]
+
+
+@dataclass
+class DispatchStats:
+    requests: int = 0
+    # Travel times per provider not requested as an earlier phase failed for their key
+    skipped: Counter = field(default_factory=Counter)
+
+
+async def dispatch(
+    origins: List[Coordinates],
+    destinations: List[Coordinates],
+    time_instants: List[datetime],
+    request_handlers: Dict[str, BaseRequestHandler],
+    mode: Mode,
+    store: ResultStore,
+    cache: ResultCache,
+    deadlines: DepartureDeadlines,
+    pairs_per_time: Optional[Sequence[Sequence[int]]] = None,
+    cost_ordered: bool = False,
+) -> DispatchStats:
+    """
+    Sends the requests of every phase, each for the keys all earlier phases' providers
+    returned a travel time for, since rows missing any travel time are dropped anyway.
+    """
+    stats = DispatchStats()
+    queried: List[str] = []
+    for phase in dispatch_phases(request_handlers, cost_ordered):
+        phase_pairs = pairs_per_time
+        if queried:
+            complete = store.complete(queried)
+            all_pairs = range(len(origins))
+            phase_pairs = []
+            for time_index in range(len(time_instants)):
+                pairs = (
+                    all_pairs if pairs_per_time is None else pairs_per_time[time_index]
+                )
+                kept = [
+                    pair_index
+                    for pair_index in pairs
+                    if complete[pair_index, time_index]
+                ]
+                phase_pairs.append(kept)
+                for api in phase:
+                    stats.skipped[api] += len(pairs) - len(kept)
+
+        with profiling.stage(profiling.GENERATE_TASKS):
+            tasks = generate_pair_tasks(
+                origins,
+                destinations,
+                time_instants,
+                phase,
+                mode,
+                store,
+                cache,
+                deadlines,
+                pairs_per_time=phase_pairs,
+            )
+
+        capitalized_providers_str = ", ".join(
+            [get_capitalized_provider_name(provider) for provider in phase]
+        )
+        logger.info(
+            f"Sending {len(tasks)} requests to {capitalized_providers_str} APIs"
+        )
+
+        with profiling.stage(profiling.REQUESTS):
+            await asyncio.gather(*tasks)
+        stats.requests += len(tasks)
+        queried.extend(phase)
+    return stats
+
+
+def log_skipped_requests(stats: DispatchStats):
+    for api, skipped in stats.skipped.items():
+        if skipped > 0:
+            logger.info(
+                f"Cost-ordered dispatch saved {skipped} {get_capitalized_provider_name(api)} travel times "
+                f"of pairs and departure times another provider failed on"
+            )
+
+
 async def collect_travel_times(
     args,
     data,
     request_handlers: Dict[str, BaseRequestHandler],
     provider_names: List[str],
+    cache: Optional[ResultCache] = None,
 ) -> DataFrame:
-    timezone = pytz.timezone(args.time_zone_id)
-    localized_start_datetime = localize_datetime(args.date, args.start_time, timezone)
-    localized_end_datetime = localize_datetime(args.date, args.end_time, timezone)
-    time_instants = generate_time_instants(
-        localized_start_datetime, localized_end_datetime, args.interval
-    )
+    time_instants = get_time_instants(args)
+    store = ResultStore(data, time_instants, provider_names)
+    cache = cache if cache is not None else ResultCache()
+    cache_hits_before = cache.hits
+    deadlines = DepartureDeadlines(request_handlers)
 
-    tasks = generate_tasks(data, time_instants, request_handlers, mode=Mode.DRIVING)
+    # Coordinates are parsed once per pair rather than once per request
+    origins, destinations = parse_pair_coordinates(data)
+    stats = await dispatch(
+        origins,
+        destinations,
+        time_instants,
+        request_handlers,
+        args.mode,
+        store,
+        cache,
+        deadlines,
+        cost_ordered=args.cost_ordered,
+    )
 
-    capitalized_providers_str = ", ".join(
-        [get_capitalized_provider_name(provider) for provider in provider_names]
+    travel_times_count = len(data) * len(time_instants) * len(request_handlers)
+    cache_hits = cache.hits - cache_hits_before
+    skipped = sum(stats.skipped.values())
+    logger.info(
+        f"Collected {travel_times_count - skipped} travel times with {stats.requests - cache_hits} requests "
+        f"({travel_times_count - skipped - stats.requests} saved by batching and time-invariant providers, "
+        f"{cache_hits} by the cache)"
     )
-    logger.info(f"Sending {len(tasks)} requests to {capitalized_providers_str} APIs")
+    log_skipped_requests(stats)
+    if deadlines.skipped > 0:
+        logger.warning(
+            f"Skipped {deadlines.skipped} requests with departure times in the past"
+        )
+    for api, request_handler in request_handlers.items():
+        breaker = request_handler.circuit_breaker
+        if breaker is not None and breaker.short_circuited > 0:
+            logger.warning(
+                f"Skipped {breaker.short_circuited} {get_capitalized_provider_name(api)} requests "
+                f"after it was dropped from the run"
+            )
+
+    with profiling.stage(profiling.BUILD_RESULTS):
+        results = store.to_dataframe()
+        results.to_csv(args.output, index=False)
+    return results
 
-    results = await asyncio.gather(*tasks)
 
-    results_df = pd.DataFrame(results)
-    deduplicated = results_df.groupby(
-        [Fields.ORIGIN, Fields.DESTINATION, Fields.DEPARTURE_TIME], as_index=False
-    ).agg({Fields.TRAVEL_TIME[provider]: "first" for provider in provider_names})
-    deduplicated.to_csv(args.output, index=False)
-    return deduplicated
+def get_time_instants(args) -> List[datetime]:
+    timezone = pytz.timezone(args.time_zone_id)
+    localized_start_datetime = localize_datetime(args.date, args.start_time, timezone)
+    localized_end_datetime = localize_datetime(args.date, args.end_time, timezone)
+    return generate_time_instants(
+        localized_start_datetime, localized_end_datetime, args.interval
+    )
 
 
 def generate_time_instants(
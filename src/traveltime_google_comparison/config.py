@@ -1,11 +1,12 @@
 import argparse
 from dataclasses import dataclass
 from enum import Enum
-from typing import List
+from typing import List, Optional
 
 import pandas
 from traveltimepy.http import json
 
+from traveltime_google_comparison.requests.circuit_breaker import BreakerPolicy
 from traveltime_google_comparison.requests.traveltime_credentials import (
     Credentials,
 )
@@ -30,11 +31,16 @@ pandas.set_option("display.max_columns", None)
 pandas.set_option("display.width", None)
 
 
+# `max-rpm` value which disables rate limiting, e.g. for self-hosted routers
+UNLIMITED_RPM = "unlimited"
+
+
 @dataclass
 class Provider:
     name: str
-    max_rpm: int
+    max_rpm: Optional[int]  # None means unlimited
     credentials: Credentials
+    base_url: Optional[str] = None
 
 
 @dataclass
@@ -50,12 +56,37 @@ class Mode(Enum):
     DRIVING = "driving"
     PUBLIC_TRANSPORT = "public_transport"
 
+    def __str__(self) -> str:
+        return self.value
+
+
+def parse_band_edges(value: str) -> List[float]:
+    edges = sorted(float(edge) for edge in value.split(","))
+    if len(edges) < 2:
+        raise argparse.ArgumentTypeError(
+            "Bands need at least a lower and an upper edge."
+        )
+    return edges
+
 
 def parse_args():
     parser = argparse.ArgumentParser(
         description="Fetch and compare travel times from TravelTime Routes API and it's competitors"
     )
-    parser.add_argument("--input", required=True, help="Input CSV file path")
+    parser.add_argument(
+        "--input",
+        required=True,
+        nargs="+",
+        help="Input CSV file paths. Pairs repeated across the files are requested once.",
+    )
+    parser.add_argument(
+        "--input-cache-dir",
+        required=False,
+        help=(
+            "Directory for compiled copies of the input files. Input files are parsed once "
+            "and memory mapped by later runs, until they change."
+        ),
+    )
     parser.add_argument("--output", required=True, help="Output CSV file path")
     parser.add_argument("--date", required=True, help="Date (YYYY-MM-DD)")
     parser.add_argument("--start-time", required=True, help="Start time (HH:MM)")
@@ -68,6 +99,17 @@ def parse_args():
         required=True,
         help="Non-abbreviated time zone identifier e.g. Europe/London",
     )
+    parser.add_argument(
+        "--mode",
+        required=False,
+        type=Mode,
+        choices=list(Mode),
+        default=Mode.DRIVING,
+        help=(
+            "Transportation mode to compare, `driving` or `public_transport`. "
+            "Providers not supporting the mode are skipped. Default - driving"
+        ),
+    )
     parser.add_argument(
         "--config",
         required=False,
@@ -82,9 +124,118 @@ def parse_args():
             "Input file must conform to the output file format."
         ),
     )
+    parser.add_argument(
+        "--distance-bands",
+        required=False,
+        type=parse_band_edges,
+        help=(
+            "Comma separated haversine distance band edges in km, e.g. 0,5,20,80. "
+            "If set, error statistics are also reported per distance band."
+        ),
+    )
+    parser.add_argument(
+        "--time-bands",
+        required=False,
+        type=parse_band_edges,
+        help=(
+            "Comma separated departure hour band edges, e.g. 0,7,10,16,19,24. "
+            "If set, error statistics are also reported per time of day band."
+        ),
+    )
+    parser.add_argument(
+        "--bands-output",
+        required=False,
+        help="Output CSV file path for the per band error statistics",
+    )
+    parser.add_argument(
+        "--plan",
+        action=argparse.BooleanOptionalAction,
+        help=(
+            "If set, estimates request counts, run time and billing units per provider "
+            "and exits without sending any requests."
+        ),
+    )
+    parser.add_argument(
+        "--cost-ordered",
+        action=argparse.BooleanOptionalAction,
+        help=(
+            "If set, TravelTime and free providers are queried first, and paid providers only "
+            "for pairs and departure times all of them returned a travel time for."
+        ),
+    )
+    parser.add_argument(
+        "--circuit-breaker",
+        required=False,
+        type=BreakerPolicy,
+        choices=list(BreakerPolicy),
+        help=(
+            "If set, a provider failing most of its requests is either paused and probed until "
+            "it recovers (pause) or dropped from the run (drop)."
+        ),
+    )
+    parser.add_argument(
+        "--target-ci-width",
+        required=False,
+        type=float,
+        help=(
+            "If set, pairs and departure times are requested in random order until the 95%% confidence "
+            "interval of every provider's 90th percentile relative error is narrower than this many "
+            "percentage points, e.g. 2 for about ±1%%."
+        ),
+    )
+    parser.add_argument(
+        "--sample-round-size",
+        required=False,
+        type=int,
+        default=100,
+        help="Pairs and departure times requested between convergence checks. Default - 100",
+    )
+    parser.add_argument(
+        "--sample-seed",
+        required=False,
+        type=int,
+        help="Random seed for the order of --target-ci-width sampling",
+    )
+    parser.add_argument(
+        "--database",
+        required=False,
+        help=(
+            "SQLite database file path. If set, the results are appended to it as a new run, "
+            "to be queried with traveltime_google_comparison_query."
+        ),
+    )
+    parser.add_argument(
+        "--profile",
+        required=False,
+        help=(
+            "Directory for profiling reports. If set, every pipeline stage is timed "
+            "and the main thread's stacks are sampled into a flamegraph compatible file."
+        ),
+    )
+    parser.add_argument(
+        "--profile-memory",
+        action=argparse.BooleanOptionalAction,
+        help="If set together with --profile, traces memory allocated by every stage.",
+    )
+    parser.add_argument(
+        "--profile-cprofile",
+        action=argparse.BooleanOptionalAction,
+        help="If set together with --profile, also writes cProfile statistics.",
+    )
     return parser.parse_args()
 
 
+def parse_max_rpm(provider_data: dict, provider_name: str) -> Optional[int]:
+    if "max-rpm" in provider_data:
+        max_rpm = provider_data["max-rpm"]
+        return None if max_rpm == UNLIMITED_RPM else int(max_rpm)
+
+    # Imported here, as the registry imports the handlers, which import this module
+    from traveltime_google_comparison.requests.registry import get_provider_spec
+
+    return get_provider_spec(provider_name).default_max_rpm
+
+
 def parse_json_to_providers(json_data: str) -> Providers:
     data = json.loads(json_data)
 
@@ -92,7 +243,7 @@ def parse_json_to_providers(json_data: str) -> Providers:
     traveltime_data = data["traveltime"]
     base_provider = Provider(
         name="traveltime",
-        max_rpm=int(traveltime_data["max-rpm"]),
+        max_rpm=parse_max_rpm(traveltime_data, "traveltime"),
         credentials=Credentials(
             app_id=traveltime_data["app-id"], api_key=traveltime_data["api-key"]
         ),
@@ -105,8 +256,9 @@ def parse_json_to_providers(json_data: str) -> Providers:
         if enabled:
             competitor = Provider(
                 name=provider_data["name"],
-                max_rpm=int(provider_data["max-rpm"]),
+                max_rpm=parse_max_rpm(provider_data, provider_data["name"]),
                 credentials=Credentials(api_key=provider_data["api-key"]),
+                base_url=provider_data.get("base-url"),
             )
             competitors.append(competitor)
 
@@ -0,0 +1,229 @@
+import argparse
+import logging
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import List, Optional
+
+import pandas as pd
+from pandas import DataFrame
+
+from traveltime_google_comparison.collect import (
+    Fields,
+    get_capitalized_provider_name,
+)
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS runs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        created_at TEXT NOT NULL,
+        input TEXT NOT NULL,
+        mode TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS results (
+        run_id INTEGER NOT NULL REFERENCES runs (id),
+        origin TEXT NOT NULL,
+        destination TEXT NOT NULL,
+        departure_time TEXT NOT NULL,
+        provider TEXT NOT NULL,
+        travel_time INTEGER NOT NULL,
+        traveltime_travel_time INTEGER NOT NULL,
+        absolute_error REAL NOT NULL,
+        relative_error REAL NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS runs_input ON runs (input)",
+    "CREATE INDEX IF NOT EXISTS results_provider_departure_time ON results (provider, departure_time)",
+    "CREATE INDEX IF NOT EXISTS results_run ON results (run_id)",
+    "CREATE INDEX IF NOT EXISTS results_pair ON results (origin, destination)",
+]
+
+# Departure times are stored in UTC, so text comparison orders them chronologically
+DEPARTURE_TIME_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+PERIOD_FORMATS = {
+    "day": "%Y-%m-%d",
+    "week": "%Y-W%W",
+    "month": "%Y-%m",
+}
+
+
+@dataclass
+class RunInfo:
+    input: str
+    mode: str
+
+
+def connect(database_file: str) -> sqlite3.Connection:
+    connection = sqlite3.connect(database_file)
+    for statement in SCHEMA:
+        connection.execute(statement)
+    return connection
+
+
+def append_run(database_file: str, results: DataFrame, run: RunInfo) -> Optional[int]:
+    """
+    Appends results in the long format of `analysis.to_long_results`,
+    one row per pair, departure time and competitor, as a new run.
+    """
+    rows = results.copy()
+    rows[Fields.DEPARTURE_TIME] = pd.to_datetime(
+        rows[Fields.DEPARTURE_TIME], utc=True
+    ).dt.strftime(DEPARTURE_TIME_FORMAT)
+
+    connection = connect(database_file)
+    try:
+        with connection:
+            cursor = connection.execute(
+                "INSERT INTO runs (created_at, input, mode) VALUES (?, ?, ?)",
+                (
+                    datetime.now(timezone.utc).strftime(DEPARTURE_TIME_FORMAT),
+                    run.input,
+                    run.mode,
+                ),
+            )
+            run_id = cursor.lastrowid
+            rows.insert(0, "run_id", run_id)
+            rows.to_sql("results", connection, if_exists="append", index=False)
+    finally:
+        connection.close()
+
+    logger.info(f"Appended {len(rows)} results to {database_file} as run {run_id}")
+    return run_id
+
+
+def query_trends(
+    database_file: str,
+    quantile: float,
+    period: str,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    providers: Optional[List[str]] = None,
+    input_name: Optional[str] = None,
+) -> DataFrame:
+    """
+    Error statistics per provider and period of departure time.
+    Filtering happens in SQLite through the indexes; only matching errors are loaded.
+    """
+    conditions = []
+    params: list = []
+    if start is not None:
+        conditions.append("results.departure_time >= ?")
+        params.append(start)
+    if end is not None:
+        conditions.append("results.departure_time < ?")
+        params.append(end)
+    if providers:
+        conditions.append(f"results.provider IN ({', '.join('?' * len(providers))})")
+        params.extend(providers)
+    if input_name is not None:
+        conditions.append("runs.input = ?")
+        params.append(input_name)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    query = f"""
+        SELECT
+            results.provider AS provider,
+            strftime('{PERIOD_FORMATS[period]}', results.departure_time) AS period,
+            results.absolute_error AS absolute_error,
+            results.relative_error AS relative_error
+        FROM results JOIN runs ON runs.id = results.run_id
+        {where}
+    """
+
+    connection = connect(database_file)
+    try:
+        errors = pd.read_sql_query(query, connection, params=params)
+    finally:
+        connection.close()
+    # Keeps the error columns numeric when nothing matches
+    errors = errors.astype({"absolute_error": float, "relative_error": float})
+
+    grouped = errors.groupby(["provider", "period"])
+    trends = grouped["relative_error"].agg(["count", "mean"])
+    trends["quantile"] = grouped["relative_error"].quantile(
+        quantile, interpolation="higher"
+    )
+    trends["mean_absolute_error"] = grouped["absolute_error"].mean()
+    return trends.reset_index()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Query error trends from a database of comparison runs"
+    )
+    parser.add_argument("--database", required=True, help="SQLite database file path")
+    parser.add_argument(
+        "--period",
+        required=False,
+        choices=list(PERIOD_FORMATS),
+        default="week",
+        help="Period to group departure times by. Default - week",
+    )
+    parser.add_argument(
+        "--start",
+        required=False,
+        help="Earliest departure time (UTC), e.g. 2024-01-01 or 2024-01-01T07:00:00",
+    )
+    parser.add_argument(
+        "--end", required=False, help="Departure time (UTC) to stop before"
+    )
+    parser.add_argument(
+        "--providers",
+        required=False,
+        nargs="+",
+        help="Competitor providers to include. Default - all",
+    )
+    parser.add_argument(
+        "--input", required=False, help="Only include runs of this input file name"
+    )
+    parser.add_argument(
+        "--quantile",
+        required=False,
+        type=float,
+        default=0.90,
+        help="Quantile of the relative error to report. Default - 0.9",
+    )
+    parser.add_argument(
+        "--output", required=False, help="Output CSV file path for the trends"
+    )
+    return parser.parse_args()
+
+
+def main():
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s | %(levelname)s | %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+    args = parse_args()
+    trends = query_trends(
+        args.database,
+        args.quantile,
+        args.period,
+        args.start,
+        args.end,
+        args.providers,
+        args.input,
+    )
+    if len(trends) == 0:
+        logger.info("No results match the query.")
+        return
+
+    for row in trends.to_dict("records"):
+        logger.info(
+            f"{get_capitalized_provider_name(row['provider'])} {row['period']}: mean relative error {row['mean']:.2f}%, "
+            f"{int(args.quantile * 100)}% of results differ by less than {int(row['quantile'])}% "
+            f"({row['count']} rows)"
+        )
+    if args.output is not None:
+        trends.to_csv(args.output, index=False)
+
+
+if __name__ == "__main__":
+    main()
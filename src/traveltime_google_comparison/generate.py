@@ -0,0 +1,274 @@
+import argparse
+import logging
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from traveltime_google_comparison.collect import Fields
+from traveltime_google_comparison.config import parse_band_edges
+from traveltime_google_comparison.geo import (
+    EARTH_RADIUS_KM,
+    format_coordinates_column,
+    haversine_km,
+    parse_coordinates_column,
+)
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s | %(levelname)s | %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+
+logger = logging.getLogger(__name__)
+
+KM_PER_DEGREE = np.pi * EARTH_RADIUS_KM / 180
+MAX_SAMPLING_ROUNDS = 50
+
+
+class SpatialGrid:
+    """
+    Uniform grid over an equirectangular projection of the points.
+    Points are sorted by cell, so every cell is a contiguous slice of `order`.
+    """
+
+    def __init__(self, lat: np.ndarray, lng: np.ndarray, cell_size_km: float):
+        self.lat = lat
+        self.lng = lng
+        self.cell_size_km = cell_size_km
+        self._lng_scale = np.cos(np.radians(np.mean(lat)))
+
+        cell_x, cell_y = self.cells(lat, lng)
+        self._min_x = cell_x.min()
+        self._min_y = cell_y.min()
+        keys = self._keys(cell_x, cell_y)
+
+        self.order = np.argsort(keys, kind="stable")
+        self.cell_keys, self.cell_starts, self.cell_counts = np.unique(
+            keys[self.order], return_index=True, return_counts=True
+        )
+
+    def cells(self, lat: np.ndarray, lng: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        x = lng * KM_PER_DEGREE * self._lng_scale
+        y = lat * KM_PER_DEGREE
+        return (
+            np.floor(x / self.cell_size_km).astype(np.int64),
+            np.floor(y / self.cell_size_km).astype(np.int64),
+        )
+
+    def _keys(self, cell_x: np.ndarray, cell_y: np.ndarray) -> np.ndarray:
+        # Shifting by the grid origin keeps keys non-negative; the 2**31 stride
+        # leaves room for the one-cell border probed around the points.
+        return (cell_x - self._min_x + 1) * 2**31 + (cell_y - self._min_y + 1)
+
+    def cell_index(self, point_indices: np.ndarray) -> np.ndarray:
+        cell_x, cell_y = self.cells(self.lat[point_indices], self.lng[point_indices])
+        return np.searchsorted(self.cell_keys, self._keys(cell_x, cell_y))
+
+    def random_neighbours(
+        self, point_indices: np.ndarray, rng: np.random.Generator
+    ) -> np.ndarray:
+        """
+        For every point, picks a random point from one of the 3x3 cells around it.
+        Returns -1 where the chosen cell is empty.
+        """
+        cell_x, cell_y = self.cells(self.lat[point_indices], self.lng[point_indices])
+        cell_x = cell_x + rng.integers(-1, 2, size=len(point_indices))
+        cell_y = cell_y + rng.integers(-1, 2, size=len(point_indices))
+        keys = self._keys(cell_x, cell_y)
+
+        cells = np.searchsorted(self.cell_keys, keys)
+        cells = np.minimum(cells, len(self.cell_keys) - 1)
+        found = self.cell_keys[cells] == keys
+
+        offsets = (rng.random(len(point_indices)) * self.cell_counts[cells]).astype(
+            np.int64
+        )
+        neighbours = self.order[self.cell_starts[cells] + offsets]
+        return np.where(found, neighbours, -1)
+
+
+def rank_within_groups(groups: np.ndarray) -> np.ndarray:
+    """Position of every element among the elements sharing its group, in input order."""
+    order = np.argsort(groups, kind="stable")
+    sorted_groups = groups[order]
+    starts = np.r_[0, np.flatnonzero(np.diff(sorted_groups)) + 1]
+    group_sizes = np.diff(np.r_[starts, len(groups)])
+    ranks = np.empty(len(groups), dtype=np.int64)
+    ranks[order] = np.arange(len(groups)) - np.repeat(starts, group_sizes)
+    return ranks
+
+
+def sample_pairs(
+    lat: np.ndarray,
+    lng: np.ndarray,
+    pairs: int,
+    min_distance_km: float,
+    max_distance_km: float,
+    rng: np.random.Generator,
+    spread: Optional[Tuple[SpatialGrid, np.ndarray, int]] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    `spread` is a grid, its per-cell pair counts (updated in place)
+    and the maximum number of pairs allowed to start in one cell.
+    """
+    # A cell as wide as the maximum distance guarantees every valid
+    # destination lies within the 3x3 neighbourhood of the origin cell.
+    grid = SpatialGrid(lat, lng, max_distance_km)
+
+    origins = np.empty(0, dtype=np.int64)
+    destinations = np.empty(0, dtype=np.int64)
+    for _ in range(MAX_SAMPLING_ROUNDS):
+        missing = pairs - len(origins)
+        if missing <= 0:
+            break
+
+        candidates = rng.integers(len(lat), size=max(4 * missing, 1024))
+        neighbours = grid.random_neighbours(candidates, rng)
+        valid = (neighbours >= 0) & (neighbours != candidates)
+        candidates, neighbours = candidates[valid], neighbours[valid]
+
+        distances = haversine_km(
+            lat[candidates], lng[candidates], lat[neighbours], lng[neighbours]
+        )
+        in_band = (distances >= min_distance_km) & (distances <= max_distance_km)
+        candidates, neighbours = candidates[in_band], neighbours[in_band]
+
+        pair_keys = np.r_[
+            origins * len(lat) + destinations, candidates * len(lat) + neighbours
+        ]
+        _, first = np.unique(pair_keys, return_index=True)
+        new = np.sort(first[first >= len(origins)]) - len(origins)
+        candidates, neighbours = candidates[new], neighbours[new]
+
+        if spread is not None:
+            spread_grid, cell_usage, max_pairs_per_cell = spread
+            cells = spread_grid.cell_index(candidates)
+            allowed = rank_within_groups(cells) < max_pairs_per_cell - cell_usage[cells]
+            candidates, neighbours = candidates[allowed], neighbours[allowed]
+            np.add.at(cell_usage, cells[allowed], 1)
+
+        origins = np.r_[origins, candidates[:missing]]
+        destinations = np.r_[destinations, neighbours[:missing]]
+
+    if len(origins) < pairs:
+        logger.warning(
+            f"Generated only {len(origins)} of {pairs} pairs between "
+            f"{min_distance_km} and {max_distance_km} km"
+        )
+    return origins, destinations
+
+
+def generate_pairs(
+    points: DataFrame,
+    pairs: int,
+    distance_bands: List[float],
+    max_pairs_per_cell: Optional[int] = None,
+    spread_cell_size_km: float = 1.0,
+    seed: Optional[int] = None,
+) -> DataFrame:
+    rng = np.random.default_rng(seed)
+    lat = points["lat"].to_numpy(dtype=np.float64)
+    lng = points["lng"].to_numpy(dtype=np.float64)
+
+    spread = None
+    if max_pairs_per_cell is not None:
+        spread_grid = SpatialGrid(lat, lng, spread_cell_size_km)
+        cell_usage = np.zeros(len(spread_grid.cell_keys), dtype=np.int64)
+        spread = (spread_grid, cell_usage, max_pairs_per_cell)
+
+    bands = list(zip(distance_bands[:-1], distance_bands[1:]))
+    pairs_per_band = -(-pairs // len(bands))
+
+    sampled = [
+        sample_pairs(lat, lng, pairs_per_band, band_min, band_max, rng, spread)
+        for band_min, band_max in bands
+    ]
+    origins = np.concatenate([band_origins for band_origins, _ in sampled])[:pairs]
+    destinations = np.concatenate([band_dest for _, band_dest in sampled])[:pairs]
+
+    return DataFrame(
+        {
+            Fields.ORIGIN: format_coordinates_column(lat[origins], lng[origins]),
+            Fields.DESTINATION: format_coordinates_column(
+                lat[destinations], lng[destinations]
+            ),
+        }
+    )
+
+
+def read_points(file_path: str) -> DataFrame:
+    """
+    Reads a point set either from `lat`/`lng` columns,
+    or from the origins and destinations of an input file.
+    """
+    data = pd.read_csv(file_path)
+    if {"lat", "lng"}.issubset(data.columns):
+        return data[["lat", "lng"]].drop_duplicates()
+
+    coordinates = pd.concat([data[Fields.ORIGIN], data[Fields.DESTINATION]])
+    lat, lng = parse_coordinates_column(coordinates)
+    return DataFrame({"lat": lat, "lng": lng}).drop_duplicates()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Generate origin/destination pairs from a point set"
+    )
+    parser.add_argument(
+        "--points",
+        required=True,
+        help="CSV file with `lat` and `lng` columns, or an input file with origin/destination pairs",
+    )
+    parser.add_argument("--output", required=True, help="Output CSV file path")
+    parser.add_argument(
+        "--pairs", required=True, type=int, help="Number of pairs to generate"
+    )
+    parser.add_argument(
+        "--distance-bands",
+        required=True,
+        type=parse_band_edges,
+        help=(
+            "Comma separated haversine distance band edges in km, e.g. 0,5,20,80. "
+            "Pairs are split evenly between the bands."
+        ),
+    )
+    parser.add_argument(
+        "--max-pairs-per-cell",
+        required=False,
+        type=int,
+        help="Maximum number of pairs starting in one grid cell, to spread pairs across the region",
+    )
+    parser.add_argument(
+        "--spread-cell-size",
+        required=False,
+        type=float,
+        default=1.0,
+        help="Size in km of the grid cells used by --max-pairs-per-cell. Default - 1",
+    )
+    parser.add_argument(
+        "--seed", required=False, type=int, help="Random seed for reproducible output"
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    points = read_points(args.points)
+    logger.info(f"Generating {args.pairs} pairs from {len(points)} points")
+
+    pairs = generate_pairs(
+        points,
+        args.pairs,
+        args.distance_bands,
+        args.max_pairs_per_cell,
+        args.spread_cell_size,
+        args.seed,
+    )
+    pairs.to_csv(args.output, index=False)
+    logger.info(f"Generated {len(pairs)} pairs into {args.output} file")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+from typing import Tuple
+
+import numpy as np
+from pandas import Series
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(
+    lat1: np.ndarray, lng1: np.ndarray, lat2: np.ndarray, lng2: np.ndarray
+) -> np.ndarray:
+    lat1, lng1, lat2, lng2 = (
+        np.radians(np.asarray(value, dtype=np.float64))
+        for value in (lat1, lng1, lat2, lng2)
+    )
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def parse_coordinates_column(coordinates: Series) -> Tuple[np.ndarray, np.ndarray]:
+    """Vectorized counterpart of `collect.parse_coordinates` for a whole column."""
+    parts = coordinates.str.split(",", expand=True)
+    if parts.shape[1] != 2:
+        raise ValueError(
+            "Coordinates must be latitude and longitude separated by a comma."
+        )
+    lat = parts[0].str.strip().astype(np.float64).to_numpy()
+    lng = parts[1].str.strip().astype(np.float64).to_numpy()
+    return lat, lng
+
+
+def format_coordinates_column(lat: np.ndarray, lng: np.ndarray) -> Series:
+    return Series(lat).astype(str) + ", " + Series(lng).astype(str)
@@ -0,0 +1,112 @@
+import hashlib
+import json
+import logging
+import os
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from traveltime_google_comparison.collect import COORDINATE_COLUMNS, Fields
+from traveltime_google_comparison.geo import parse_coordinates_column
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever the layout of compiled inputs changes, invalidating older ones
+CACHE_VERSION = 1
+
+
+def cache_paths(input_path: str, cache_dir: str) -> Tuple[str, str]:
+    """Paths of the compiled records and of their JSON header."""
+    digest = hashlib.sha1(os.path.abspath(input_path).encode()).hexdigest()[:16]
+    base_path = os.path.join(cache_dir, f"{os.path.basename(input_path)}-{digest}")
+    return f"{base_path}.npy", f"{base_path}.json"
+
+
+def input_signature(input_path: str) -> dict:
+    stat = os.stat(input_path)
+    return {
+        "version": CACHE_VERSION,
+        "path": os.path.abspath(input_path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+    }
+
+
+def compile_input(input_path: str, cache_dir: str) -> np.ndarray:
+    """
+    Parses an input file once into a structured array holding the original coordinate
+    strings and their float64 latitudes and longitudes, saved as `.npy` so later runs
+    can memory map it.
+    """
+    data = pd.read_csv(input_path, usecols=[Fields.ORIGIN, Fields.DESTINATION])
+    origin_lat, origin_lng = parse_coordinates_column(data[Fields.ORIGIN])
+    destination_lat, destination_lng = parse_coordinates_column(
+        data[Fields.DESTINATION]
+    )
+    origins = data[Fields.ORIGIN].to_numpy(dtype=str).astype(np.bytes_)
+    destinations = data[Fields.DESTINATION].to_numpy(dtype=str).astype(np.bytes_)
+
+    records = np.empty(
+        len(data),
+        dtype=[
+            (Fields.ORIGIN, origins.dtype),
+            (Fields.DESTINATION, destinations.dtype),
+        ]
+        + [(column, np.float64) for column in COORDINATE_COLUMNS],
+    )
+    records[Fields.ORIGIN] = origins
+    records[Fields.DESTINATION] = destinations
+    for column, values in zip(
+        COORDINATE_COLUMNS, [origin_lat, origin_lng, destination_lat, destination_lng]
+    ):
+        records[column] = values
+
+    records_path, header_path = cache_paths(input_path, cache_dir)
+    os.makedirs(cache_dir, exist_ok=True)
+    # Written under temporary names and moved in place, so concurrent runs
+    # never open a partially written file
+    with open(f"{records_path}.tmp", "wb") as records_file:
+        np.save(records_file, records)
+    os.replace(f"{records_path}.tmp", records_path)
+    with open(f"{header_path}.tmp", "w") as header_file:
+        json.dump({**input_signature(input_path), "rows": len(records)}, header_file)
+    os.replace(f"{header_path}.tmp", header_path)
+
+    logger.info(f"Compiled {len(records)} pairs from {input_path} into {records_path}")
+    return records
+
+
+def open_compiled_input(input_path: str, cache_dir: str) -> Optional[np.ndarray]:
+    """Memory maps the compiled input, if it is still up to date with the input file."""
+    records_path, header_path = cache_paths(input_path, cache_dir)
+    if not os.path.exists(records_path) or not os.path.exists(header_path):
+        return None
+
+    with open(header_path) as header_file:
+        header = json.load(header_file)
+    rows = header.pop("rows", None)
+    if header != input_signature(input_path):
+        return None
+
+    records = np.load(records_path, mmap_mode="r")
+    if len(records) != rows:
+        return None
+    return records
+
+
+def read_input(input_path: str, cache_dir: str) -> DataFrame:
+    records = open_compiled_input(input_path, cache_dir)
+    if records is None:
+        records = compile_input(input_path, cache_dir)
+    else:
+        logger.debug(f"Using compiled input for {input_path}")
+
+    columns = {
+        Fields.ORIGIN: records[Fields.ORIGIN].astype(str),
+        Fields.DESTINATION: records[Fields.DESTINATION].astype(str),
+    }
+    for column in COORDINATE_COLUMNS:
+        columns[column] = records[column]
+    return DataFrame(columns)
@@ -1,14 +1,24 @@
 import asyncio
 import logging
+import os
+from datetime import datetime, timezone
+from typing import Dict, List, Tuple
 
 import pandas as pd
 
 from traveltime_google_comparison import collect
 from traveltime_google_comparison import config
+from traveltime_google_comparison import input_cache
+from traveltime_google_comparison import plan
+from traveltime_google_comparison import profiling
+from traveltime_google_comparison import sampling
 from traveltime_google_comparison.analysis import run_analysis
-from traveltime_google_comparison.config import parse_config
+from traveltime_google_comparison.config import Providers, parse_config
+from traveltime_google_comparison.database import RunInfo
 from traveltime_google_comparison.collect import Fields
 from traveltime_google_comparison.requests import factory
+from traveltime_google_comparison.requests.base_handler import BaseRequestHandler
+from traveltime_google_comparison.requests.registry import filter_providers_for_mode
 
 logging.basicConfig(
     level=logging.INFO,
@@ -18,34 +28,120 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+QUANTILE = 0.90
+
+
+def read_input_files(file_paths: List[str], columns: List[str]) -> pd.DataFrame:
+    return pd.concat(
+        [pd.read_csv(file_path, usecols=columns) for file_path in file_paths],
+        ignore_index=True,
+    )
+
 
 async def run():
     args = config.parse_args()
+    if args.profile is not None:
+        profiling.enable(
+            profiling.Profiler(args.profile, args.profile_memory, args.profile_cprofile)
+        )
+    try:
+        await run_comparison(args)
+    finally:
+        profiling.disable()
+
+
+def read_pairs(args) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """All pairs of the input files, and the pairs without repeats."""
+    with profiling.stage(profiling.READ_INPUT):
+        if args.input_cache_dir is not None:
+            all_pairs = pd.concat(
+                [
+                    input_cache.read_input(file_path, args.input_cache_dir)
+                    for file_path in args.input
+                ],
+                ignore_index=True,
+            )
+        else:
+            all_pairs = read_input_files(
+                args.input, [Fields.ORIGIN, Fields.DESTINATION]
+            )
+        return all_pairs, all_pairs.drop_duplicates(
+            subset=[Fields.ORIGIN, Fields.DESTINATION]
+        )
+
+
+async def run_comparison(args):
     config_path = args.config
 
     # Get all providers that should be tested against TravelTime
-    providers = parse_config(config_path)
+    providers = filter_providers_for_mode(parse_config(config_path), args.mode)
+
+    gather_data = not args.plan and not args.skip_data_gathering
+    request_handlers = (
+        factory.initialize_request_handlers(providers, args.circuit_breaker)
+        if gather_data
+        else {}
+    )
+    # Connections are warmed up while the input is read in a worker thread
+    warmup = asyncio.ensure_future(factory.warmup_request_handlers(request_handlers))
+    try:
+        all_pairs, csv = await asyncio.get_running_loop().run_in_executor(
+            None, read_pairs, args
+        )
+        await warmup
+        await compare(args, providers, request_handlers, all_pairs, csv)
+    finally:
+        warmup.cancel()
+        await factory.close_request_handlers(request_handlers)
+
+
+async def compare(
+    args,
+    providers: Providers,
+    request_handlers: Dict[str, BaseRequestHandler],
+    all_pairs: pd.DataFrame,
+    csv: pd.DataFrame,
+):
     all_provider_names = providers.all_names()
 
-    csv = pd.read_csv(
-        args.input, usecols=[Fields.ORIGIN, Fields.DESTINATION]
-    ).drop_duplicates()
-
     if len(csv) == 0:
         logger.info("Provided input file is empty. Exiting.")
         return
 
-    request_handlers = factory.initialize_request_handlers(providers)
+    time_instants = collect.get_time_instants(args)
+    repeated_pairs = len(all_pairs) - len(csv)
+    if repeated_pairs > 0:
+        saved_requests = repeated_pairs * len(time_instants) * len(all_provider_names)
+        logger.info(
+            f"Skipped {repeated_pairs} repeated pairs in the input files, "
+            f"saving {saved_requests} requests"
+        )
+    plan.log_pair_statistics(plan.calculate_pair_statistics(csv))
+    if not args.skip_data_gathering:
+        plan.log_deadline_misses(
+            plan.find_deadline_misses(
+                csv, time_instants, providers, args.mode, datetime.now(timezone.utc)
+            )
+        )
+
+    if args.plan:
+        plan.log_plan(plan.create_plan(csv, time_instants, providers, args.mode))
+        return
+
     if args.skip_data_gathering:
-        travel_times_df = pd.read_csv(
+        travel_times_df = read_input_files(
             args.input,
-            usecols=[
+            [
                 Fields.ORIGIN,
                 Fields.DESTINATION,
                 Fields.DEPARTURE_TIME,
             ]  # base fields
             + [Fields.TRAVEL_TIME[provider] for provider in all_provider_names],
         )
+    elif args.target_ci_width is not None:
+        travel_times_df = await sampling.collect_sampled_travel_times(
+            args, csv, request_handlers, all_provider_names, QUANTILE
+        )
     else:
         travel_times_df = await collect.collect_travel_times(
             args, csv, request_handlers, all_provider_names
@@ -70,7 +166,21 @@ async def run():
             logger.info(
                 f"Skipped {skipped_rows} rows ({100 * skipped_rows / all_rows:.2f}%)"
             )
-        run_analysis(filtered_travel_times_df, args.output, 0.90, providers)
+        with profiling.stage(profiling.ANALYSIS):
+            run_analysis(
+                filtered_travel_times_df,
+                args.output,
+                QUANTILE,
+                providers,
+                args.distance_bands,
+                args.time_bands,
+                args.bands_output,
+                args.database,
+                RunInfo(
+                    input=", ".join(os.path.basename(path) for path in args.input),
+                    mode=args.mode.value,
+                ),
+            )
 
 
 def main():
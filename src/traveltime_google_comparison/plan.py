@@ -0,0 +1,189 @@
+import logging
+import math
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from pandas import DataFrame
+
+from traveltime_google_comparison.collect import (
+    Fields,
+    batch_pairs,
+    get_capitalized_provider_name,
+    parse_pair_coordinates,
+)
+from traveltime_google_comparison.config import Mode, Providers
+from traveltime_google_comparison.requests.registry import get_provider_spec
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ProviderPlan:
+    name: str
+    max_rpm: Optional[int]
+    requests: int
+    batched_requests: int
+    billing_units: int
+
+    @property
+    def wall_time(self) -> timedelta:
+        return estimate_wall_time(self.requests, self.max_rpm)
+
+    @property
+    def batched_wall_time(self) -> timedelta:
+        return estimate_wall_time(self.batched_requests, self.max_rpm)
+
+
+@dataclass
+class PairStatistics:
+    pairs: int
+    # Pairs whose origin also starts at least one other pair
+    shared_origin_pairs: int
+    shared_destination_pairs: int
+    # Pairs whose reverse direction is also in the input
+    symmetric_pairs: int
+
+
+def calculate_pair_statistics(data: DataFrame) -> PairStatistics:
+    origins = data[Fields.ORIGIN].str.replace(" ", "")
+    destinations = data[Fields.DESTINATION].str.replace(" ", "")
+    pairs = set(zip(origins, destinations))
+    return PairStatistics(
+        pairs=len(data),
+        shared_origin_pairs=int(origins.duplicated(keep=False).sum()),
+        shared_destination_pairs=int(destinations.duplicated(keep=False).sum()),
+        symmetric_pairs=sum(
+            1
+            for origin, destination in pairs
+            if origin != destination and (destination, origin) in pairs
+        ),
+    )
+
+
+def log_pair_statistics(statistics: PairStatistics):
+    logger.info(
+        f"{statistics.pairs} pairs: {statistics.shared_origin_pairs} share an origin, "
+        f"{statistics.shared_destination_pairs} share a destination, "
+        f"{statistics.symmetric_pairs} have their reverse pair in the input"
+    )
+
+
+def estimate_wall_time(requests: int, max_rpm: Optional[int]) -> timedelta:
+    # Unlimited providers are bounded by the router itself, which can't be estimated
+    if max_rpm is None:
+        return timedelta(0)
+    return timedelta(minutes=requests / max_rpm)
+
+
+def create_plan(
+    data: DataFrame,
+    time_instants: List[datetime],
+    providers: Providers,
+    mode: Mode,
+) -> List[ProviderPlan]:
+    # Every (origin, destination, departure time) key is one billable element,
+    # regardless of how many of them end up sharing a single request.
+    # Time-invariant providers are only asked once per pair.
+    origins, _ = parse_pair_coordinates(data)
+
+    plans = []
+    for provider in [providers.base] + providers.competitors:
+        spec = get_provider_spec(provider.name)
+        departure_times = len(time_instants) if spec.time_dependent else 1
+        keys = len(data) * departure_times
+        batches = batch_pairs(origins, spec.batch_size(mode), spec.one_to_many)
+        batched_requests = departure_times * len(batches)
+        plans.append(
+            ProviderPlan(
+                name=provider.name,
+                max_rpm=provider.max_rpm,
+                requests=keys,
+                batched_requests=batched_requests,
+                billing_units=keys,
+            )
+        )
+    return plans
+
+
+@dataclass
+class DeadlineMiss:
+    name: str
+    departure_time: datetime
+    finish_time: datetime
+
+
+def find_deadline_misses(
+    data: DataFrame,
+    time_instants: List[datetime],
+    providers: Providers,
+    mode: Mode,
+    now: datetime,
+) -> List[DeadlineMiss]:
+    """
+    Requests are sent in departure time order, so a departure time bucket is finished
+    once all requests of the earlier buckets and its own went through the rate limiter.
+    Returns the first bucket per provider which would only finish after its departure time.
+    """
+    origins, _ = parse_pair_coordinates(data)
+
+    misses = []
+    for provider in [providers.base] + providers.competitors:
+        spec = get_provider_spec(provider.name)
+        if not spec.rejects_past_departures or provider.max_rpm is None:
+            continue
+
+        requests_per_bucket = len(
+            batch_pairs(origins, spec.batch_size(mode), spec.one_to_many)
+        )
+        for bucket, departure_time in enumerate(sorted(time_instants), start=1):
+            finish_time = now + estimate_wall_time(
+                bucket * requests_per_bucket, provider.max_rpm
+            )
+            if finish_time > departure_time:
+                misses.append(DeadlineMiss(provider.name, departure_time, finish_time))
+                break
+    return misses
+
+
+def log_deadline_misses(misses: List[DeadlineMiss]):
+    for miss in misses:
+        logger.warning(
+            f"{get_capitalized_provider_name(miss.name)}: requests departing at {miss.departure_time} "
+            f"are estimated to finish at {miss.finish_time}, after their departure time. "
+            f"Use a later --date or raise max-rpm, past departure times are rejected."
+        )
+
+
+def log_plan(plans: List[ProviderPlan]):
+    for plan in plans:
+        capitalized_provider = get_capitalized_provider_name(plan.name)
+        logger.info(
+            f"{capitalized_provider}: {plan.requests} requests at {format_rpm(plan.max_rpm)}, "
+            f"estimated time {format_duration(plan.wall_time)}, "
+            f"billing units {plan.billing_units}"
+        )
+        if plan.batched_requests < plan.requests:
+            logger.info(
+                f"{capitalized_provider}: {plan.batched_requests} requests with matrix batching, "
+                f"estimated time {format_duration(plan.batched_wall_time)}"
+            )
+
+    # Providers are queried concurrently, so the slowest one bounds the run
+    total_wall_time = max(min(plan.wall_time, plan.batched_wall_time) for plan in plans)
+    total_requests = sum(min(plan.requests, plan.batched_requests) for plan in plans)
+    logger.info(
+        f"Plan: {total_requests} requests in total, "
+        f"estimated run time {format_duration(total_wall_time)}"
+    )
+
+
+def format_rpm(max_rpm: Optional[int]) -> str:
+    return "unlimited RPM" if max_rpm is None else f"{max_rpm} RPM"
+
+
+def format_duration(duration: timedelta) -> str:
+    total_seconds = math.ceil(duration.total_seconds())
+    hours, remainder = divmod(total_seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    return f"{hours:d}h {minutes:02d}m {seconds:02d}s"
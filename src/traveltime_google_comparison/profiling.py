@@ -0,0 +1,194 @@
+import cProfile
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterator, Optional
+
+from pandas import DataFrame
+
+logger = logging.getLogger(__name__)
+
+# Pipeline stages, shared by the tool and anything timing it from outside
+READ_INPUT = "read_input"
+GENERATE_TASKS = "generate_tasks"
+REQUESTS = "requests"
+LIMITER_WAIT = "limiter_wait"
+BUILD_RESULTS = "build_results"
+ANALYSIS = "analysis"
+
+STAGES_FILE = "stages.csv"
+CPROFILE_FILE = "profile.pstats"
+STACKS_FILE = "stacks.folded"
+
+
+@dataclass
+class StageStats:
+    calls: int = 0
+    seconds: float = 0.0
+    # Net growth of traced memory, only collected with memory tracing on
+    allocated_bytes: int = 0
+
+
+class StackSampler:
+    """
+    Samples the stack of one thread from a background thread,
+    counting stacks in the folded format read by flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            frames = []
+            while frame is not None:
+                code = frame.f_code
+                frames.append(
+                    f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+                )
+                frame = frame.f_back
+            if frames:
+                self.stacks[";".join(reversed(frames))] += 1
+
+    def write(self, file_path: str):
+        with open(file_path, "w") as file:
+            for stack, count in self.stacks.most_common():
+                file.write(f"{stack} {count}\n")
+
+
+class Profiler:
+    def __init__(
+        self,
+        output_dir: str,
+        trace_memory: bool = False,
+        cprofile: bool = False,
+        sample_interval: float = 0.005,
+    ):
+        self.output_dir = output_dir
+        self.trace_memory = trace_memory
+        self.stages: Dict[str, StageStats] = {}
+        self._cprofile = cProfile.Profile() if cprofile else None
+        self._sampler = StackSampler(threading.get_ident(), sample_interval)
+        self._started_at = 0.0
+        self.total_seconds = 0.0
+        self.peak_bytes = 0
+
+    def start(self):
+        self._started_at = time.perf_counter()
+        if self.trace_memory:
+            tracemalloc.start()
+        if self._cprofile is not None:
+            self._cprofile.enable()
+        self._sampler.start()
+
+    def stop(self):
+        self._sampler.stop()
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        self.total_seconds = time.perf_counter() - self._started_at
+        if self.trace_memory:
+            self.peak_bytes = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Stages can be entered by many tasks at once, e.g. limiter waits.
+        Their time then adds up over the tasks rather than the wall clock.
+        """
+        memory_before = tracemalloc.get_traced_memory()[0] if self.trace_memory else 0
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            stats = self.stages.setdefault(name, StageStats())
+            stats.calls += 1
+            stats.seconds += time.perf_counter() - started_at
+            if self.trace_memory:
+                stats.allocated_bytes += (
+                    tracemalloc.get_traced_memory()[0] - memory_before
+                )
+
+    def report(self) -> DataFrame:
+        return DataFrame(
+            [
+                {
+                    "stage": name,
+                    "calls": stats.calls,
+                    "seconds": round(stats.seconds, 6),
+                    "allocated_bytes": stats.allocated_bytes,
+                }
+                for name, stats in self.stages.items()
+            ]
+        )
+
+    def write(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        report = self.report()
+        report.to_csv(os.path.join(self.output_dir, STAGES_FILE), index=False)
+        self._sampler.write(os.path.join(self.output_dir, STACKS_FILE))
+        if self._cprofile is not None:
+            self._cprofile.dump_stats(os.path.join(self.output_dir, CPROFILE_FILE))
+
+        for row in report.to_dict("records"):
+            allocated = (
+                f", {row['allocated_bytes'] / 2**20:.1f} MiB allocated"
+                if self.trace_memory
+                else ""
+            )
+            logger.info(
+                f"Stage {row['stage']}: {row['seconds']:.3f}s over {row['calls']} calls{allocated}"
+            )
+        peak = (
+            f", peak memory {self.peak_bytes / 2**20:.1f} MiB"
+            if self.trace_memory
+            else ""
+        )
+        logger.info(
+            f"Profiled {self.total_seconds:.3f}s{peak}, reports written to {self.output_dir}"
+        )
+
+
+_active: Optional[Profiler] = None
+
+
+def enable(profiler: Profiler):
+    global _active
+    _active = profiler
+    profiler.start()
+
+
+def disable():
+    global _active
+    if _active is not None:
+        _active.stop()
+        _active.write()
+    _active = None
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Times the block as `name` if profiling is enabled, does nothing otherwise."""
+    if _active is None:
+        yield
+    else:
+        with _active.stage(name):
+            yield
@@ -1,23 +1,42 @@
+import asyncio
+import logging
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 
+import aiohttp
 from aiolimiter import AsyncLimiter
 from traveltimepy import Coordinates
 
 from traveltime_google_comparison.config import Mode
+from traveltime_google_comparison.requests.circuit_breaker import CircuitBreaker
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
 class RequestResult:
     travel_time: Optional[int]
+    # Set when the API itself failed, rather than finding no route
+    failed: bool = False
 
 
 class BaseRequestHandler(ABC):
     _rate_limiter: AsyncLimiter
     _just_checking_if_it_complains: str
+    _session: Optional[aiohttp.ClientSession] = None
+    # Set by the factory if the run uses circuit breakers
+    circuit_breaker: Optional[CircuitBreaker] = None
+
+    default_timeout = aiohttp.ClientTimeout(total=60)
+    # Maximum number of simultaneous connections kept in the handler's pool
+    connection_limit = 100
+    # Connections opened ahead of the first requests by `warmup`
+    warmup_connections = 4
+    # Resolved hosts are reused for this many seconds, rather than looked up per connection
+    dns_cache_ttl = 600
 
     @abstractmethod
     async def send_request(
@@ -29,12 +48,93 @@ class BaseRequestHandler(ABC):
     ) -> RequestResult:
         pass
 
+    async def send_batch_request(
+        self,
+        origins: List[Coordinates],
+        destinations: List[Coordinates],
+        departure_time: datetime,
+        mode: Mode,
+    ) -> List[RequestResult]:
+        """
+        Travel times for pairs of `origins[i]` and `destinations[i]` in one request.
+        Only called for providers registered with a batch size above one for the mode.
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support batch requests"
+        )
+
+    def warmup_url(self) -> Optional[str]:
+        """URL on the API host requested by `warmup`, `None` to skip warming up."""
+        return None
+
+    async def warmup(self):
+        """
+        Resolves the API host and opens pooled connections before the first request,
+        so the first rate limiter tokens aren't spent on DNS lookups and TLS handshakes.
+        """
+        url = self.warmup_url()
+        if url is None:
+            return
+
+        async def open_connection():
+            async with self.session.head(url) as response:
+                await response.read()
+
+        try:
+            await asyncio.gather(
+                *[open_connection() for _ in range(self.warmup_connections)]
+            )
+        except Exception as e:
+            logger.warning(f"Could not warm up connections to {url}, {e}")
+
     @property
     def rate_limiter(self) -> AsyncLimiter:
         return self._rate_limiter
 
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        # Created lazily, as a session has to be created inside the running event loop
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=self.default_timeout,
+                connector=aiohttp.TCPConnector(
+                    limit=self.connection_limit, ttl_dns_cache=self.dns_cache_ttl
+                ),
+            )
+        return self._session
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+
+
+def unique_coordinates(
+    coordinates: List[Coordinates],
+) -> Dict[Tuple[float, float], int]:
+    """Distinct (lat, lng) pairs in order of appearance, mapped to their position."""
+    unique: Dict[Tuple[float, float], int] = {}
+    for coordinate in coordinates:
+        unique.setdefault((coordinate.lat, coordinate.lng), len(unique))
+    return unique
+
+
+class UnlimitedLimiter(AsyncLimiter):
+    """Rate limiter which never blocks, for self-hosted routers."""
+
+    def __init__(self):
+        super().__init__(max_rate=1, time_period=1)
+
+    def has_capacity(self, amount: float = 1) -> bool:
+        return True
+
+    async def acquire(self, amount: float = 1) -> None:
+        return None
+
+
+def create_async_limiter(max_rpm: Optional[int]) -> AsyncLimiter:
+    if max_rpm is None:
+        return UnlimitedLimiter()
 
-def create_async_limiter(max_rpm: int) -> AsyncLimiter:
     # Convert max_rpm to requests per second
     rps = max_rpm / 60
 
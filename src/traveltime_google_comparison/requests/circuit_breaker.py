@@ -0,0 +1,177 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from enum import Enum
+from typing import Deque, Optional, Set
+
+from aiolimiter import AsyncLimiter
+
+logger = logging.getLogger(__name__)
+
+
+class BreakerPolicy(str, Enum):
+    # Requests wait while the breaker is open, until a probe succeeds
+    PAUSE = "pause"
+    # The provider is dropped from the run as soon as the breaker opens
+    DROP = "drop"
+
+
+class BreakerState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Opens after `consecutive_failures` failed requests in a row, or once `error_rate`
+    of the last `window` requests failed. While open, one probe request is let through
+    every `cooldown` seconds; a successful probe closes the breaker again.
+    After `max_probes` failed probes in a row the provider is dropped.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        policy: BreakerPolicy = BreakerPolicy.PAUSE,
+        consecutive_failures: int = 10,
+        error_rate: float = 0.5,
+        window: int = 50,
+        cooldown: float = 30.0,
+        max_probes: int = 10,
+    ):
+        self.name = name
+        self.policy = policy
+        self.consecutive_failures = consecutive_failures
+        self.error_rate = error_rate
+        self.cooldown = cooldown
+        self.max_probes = max_probes
+
+        self.state = BreakerState.CLOSED
+        self.dropped = False
+        # Requests skipped since the provider was dropped
+        self.short_circuited = 0
+
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self._failures_in_window = 0
+        self._failures_in_row = 0
+        self._failed_probes = 0
+        self._retry_at = 0.0
+        self._changed: Optional[asyncio.Event] = None
+        self._limiter_waiters: Set[asyncio.Task] = set()
+
+    async def acquire(self, limiter: AsyncLimiter) -> bool:
+        """
+        Waits for the rate limiter and for the breaker to let a request through.
+        False if the request should be skipped, as the provider was dropped.
+        """
+        while True:
+            if self.dropped or not await self._wait_for_limiter(limiter):
+                self.short_circuited += 1
+                return False
+            if self.state == BreakerState.CLOSED:
+                return True
+            if self.state == BreakerState.OPEN and time.monotonic() >= self._retry_at:
+                self.state = BreakerState.HALF_OPEN
+                logger.info(f"Sending a probe request to {self.name}")
+                return True
+            # The rate limiter is acquired again once the breaker changes, so held
+            # requests don't all go out at once when it closes
+            await self._wait_for_change()
+
+    def record(self, failed: bool):
+        if self.dropped:
+            return
+        if self.state == BreakerState.HALF_OPEN:
+            if not failed:
+                self._close()
+            else:
+                self._failed_probes += 1
+                if self._failed_probes >= self.max_probes:
+                    self._drop()
+                else:
+                    self._open()
+            return
+        if self.state == BreakerState.OPEN:
+            # Requests sent before the breaker opened
+            return
+
+        if len(self._outcomes) == self._outcomes.maxlen and self._outcomes[0]:
+            self._failures_in_window -= 1
+        self._outcomes.append(failed)
+        self._failures_in_window += failed
+        self._failures_in_row = self._failures_in_row + 1 if failed else 0
+
+        window_full = len(self._outcomes) == self._outcomes.maxlen
+        if self._failures_in_row >= self.consecutive_failures or (
+            window_full
+            and self._failures_in_window >= self.error_rate * len(self._outcomes)
+        ):
+            if self.policy == BreakerPolicy.DROP:
+                self._drop()
+            else:
+                self._open()
+
+    def _open(self):
+        if self.state == BreakerState.CLOSED:
+            logger.warning(
+                f"{self.name} is failing, holding its requests and probing every {self.cooldown:g}s"
+            )
+        self.state = BreakerState.OPEN
+        self._retry_at = time.monotonic() + self.cooldown
+        self._notify()
+
+    def _close(self):
+        logger.info(f"{self.name} recovered, resuming its requests")
+        self.state = BreakerState.CLOSED
+        self._outcomes.clear()
+        self._failures_in_window = 0
+        self._failures_in_row = 0
+        self._failed_probes = 0
+        self._notify()
+
+    def _drop(self):
+        logger.warning(f"{self.name} is failing, dropping it from the run")
+        self.state = BreakerState.OPEN
+        self.dropped = True
+        # Requests queued on the rate limiter are skipped rather than sent one by one
+        for task in list(self._limiter_waiters):
+            task.cancel()
+        self._notify()
+
+    def _notify(self):
+        if self._changed is not None:
+            self._changed.set()
+            self._changed = None
+
+    async def _wait_for_change(self):
+        if self._changed is None:
+            self._changed = asyncio.Event()
+        changed = self._changed
+        timeout = (
+            max(self._retry_at - time.monotonic(), 0)
+            if self.state == BreakerState.OPEN
+            else None
+        )
+        try:
+            await asyncio.wait_for(changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _wait_for_limiter(self, limiter: AsyncLimiter) -> bool:
+        task = asyncio.current_task()
+        if task is not None:
+            self._limiter_waiters.add(task)
+        try:
+            await limiter.acquire()
+            return True
+        except asyncio.CancelledError:
+            if not self.dropped or task is None:
+                raise
+            # Only this breaker's cancellation is swallowed, not one of the whole run
+            if hasattr(task, "uncancel"):
+                task.uncancel()
+            return False
+        finally:
+            self._limiter_waiters.discard(task)
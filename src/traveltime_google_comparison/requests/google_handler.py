@@ -1,7 +1,7 @@
 import logging
 from datetime import datetime
+from typing import List, Optional
 
-import aiohttp
 from traveltimepy import Coordinates
 
 from traveltime_google_comparison.config import Mode
@@ -22,13 +22,19 @@ class GoogleRequestHandler(BaseRequestHandler):
     DURATION_IN_TRAFFIC = "duration_in_traffic"
     DURATION = "duration"
     GOOGLE_DIRECTIONS_URL = "https://maps.googleapis.com/maps/api/directions/json"
-
-    default_timeout = aiohttp.ClientTimeout(total=60)
+    GOOGLE_DISTANCE_MATRIX_URL = (
+        "https://maps.googleapis.com/maps/api/distancematrix/json"
+    )
+    # Statuses of valid responses without a route, rather than of a failing API
+    NO_ROUTE_STATUSES = {"ZERO_RESULTS", "NOT_FOUND"}
 
     def __init__(self, api_key, max_rpm):
         self.api_key = api_key
         self._rate_limiter = create_async_limiter(max_rpm)
 
+    def warmup_url(self) -> Optional[str]:
+        return self.GOOGLE_DIRECTIONS_URL
+
     async def send_request(
         self,
         origin: Coordinates,
@@ -45,9 +51,7 @@ class GoogleRequestHandler(BaseRequestHandler):
             "key": self.api_key,
         }
         try:
-            async with aiohttp.ClientSession(
-                timeout=self.default_timeout
-            ) as session, session.get(
+            async with self.session.get(
                 self.GOOGLE_DIRECTIONS_URL, params=params
             ) as response:
                 data = await response.json()
@@ -71,10 +75,60 @@ class GoogleRequestHandler(BaseRequestHandler):
                     logger.error(
                         f"Error in Google API response: {status} - {error_message}"
                     )
-                    return RequestResult(None)
+                    return RequestResult(
+                        None, failed=status not in self.NO_ROUTE_STATUSES
+                    )
         except Exception as e:
             logger.error(f"Exception during requesting Google API, {e}")
+            return RequestResult(None, failed=True)
+
+    async def send_batch_request(
+        self,
+        origins: List[Coordinates],
+        destinations: List[Coordinates],
+        departure_time: datetime,
+        mode: Mode,
+    ) -> List[RequestResult]:
+        # Registered as one-to-many, so every pair of a batch shares the origin
+        origin = origins[0]
+        params = {
+            "origins": "{},{}".format(origin.lat, origin.lng),
+            "destinations": "|".join(
+                "{},{}".format(destination.lat, destination.lng)
+                for destination in destinations
+            ),
+            "mode": get_google_specific_mode(mode),
+            "traffic_model": "best_guess",
+            "departure_time": int(departure_time.timestamp()),
+            "key": self.api_key,
+        }
+        try:
+            async with self.session.get(
+                self.GOOGLE_DISTANCE_MATRIX_URL, params=params
+            ) as response:
+                data = await response.json()
+                status = data["status"]
+
+                if status == "OK":
+                    elements = data["rows"][0]["elements"]
+                    return [self._parse_element(element) for element in elements]
+                else:
+                    error_message = data.get("error_message", "")
+                    logger.error(
+                        f"Error in Google API response: {status} - {error_message}"
+                    )
+                    return [
+                        RequestResult(None, failed=status not in self.NO_ROUTE_STATUSES)
+                    ] * len(destinations)
+        except Exception as e:
+            logger.error(f"Exception during requesting Google API, {e}")
+            return [RequestResult(None, failed=True)] * len(destinations)
+
+    def _parse_element(self, element: dict) -> RequestResult:
+        if element.get("status") != "OK":
             return RequestResult(None)
+        duration = element.get(self.DURATION_IN_TRAFFIC) or element[self.DURATION]
+        return RequestResult(travel_time=duration["value"])
 
 
 def get_google_specific_mode(mode: Mode) -> str:
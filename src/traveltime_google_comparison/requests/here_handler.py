@@ -1,7 +1,7 @@
 import logging
 from datetime import datetime
+from typing import Optional
 
-import aiohttp
 from traveltimepy import Coordinates
 
 from traveltime_google_comparison.config import Mode
@@ -21,12 +21,13 @@ class HereApiError(Exception):
 class HereRequestHandler(BaseRequestHandler):
     HERE_ROUTES_URL = "https://router.hereapi.com/v8/routes"
 
-    default_timeout = aiohttp.ClientTimeout(total=60)
-
     def __init__(self, api_key, max_rpm):
         self.api_key = api_key
         self._rate_limiter = create_async_limiter(max_rpm)
 
+    def warmup_url(self) -> Optional[str]:
+        return self.HERE_ROUTES_URL
+
     async def send_request(
         self,
         origin: Coordinates,
@@ -43,9 +44,9 @@ class HereRequestHandler(BaseRequestHandler):
             "apikey": self.api_key,
         }
         try:
-            async with aiohttp.ClientSession(
-                timeout=self.default_timeout
-            ) as session, session.get(self.HERE_ROUTES_URL, params=params) as response:
+            async with self.session.get(
+                self.HERE_ROUTES_URL, params=params
+            ) as response:
                 data = await response.json()
                 if response.status == 200:
                     first_route = data["routes"][0]
@@ -76,10 +77,10 @@ class HereRequestHandler(BaseRequestHandler):
                     logger.error(
                         f"Error in HERE API response: {response.status} - {error_message}"
                     )
-                    return RequestResult(None)
+                    return RequestResult(None, failed=True)
         except Exception as e:
             logger.error(f"Exception during requesting HERE API, {e}")
-            return RequestResult(None)
+            return RequestResult(None, failed=True)
 
 
 def get_here_specific_mode(mode: Mode) -> str:
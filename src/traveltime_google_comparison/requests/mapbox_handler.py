@@ -1,7 +1,7 @@
 import logging
 from datetime import datetime
+from typing import Optional
 
-import aiohttp
 from traveltimepy import Coordinates
 
 from traveltime_google_comparison.config import Mode
@@ -21,12 +21,13 @@ class MapboxApiError(Exception):
 class MapboxRequestHandler(BaseRequestHandler):
     MAPBOX_ROUTES_URL = "https://api.mapbox.com/directions/v5/mapbox"
 
-    default_timeout = aiohttp.ClientTimeout(total=60)
-
     def __init__(self, api_key, max_rpm):
         self.api_key = api_key
         self._rate_limiter = create_async_limiter(max_rpm)
 
+    def warmup_url(self) -> Optional[str]:
+        return self.MAPBOX_ROUTES_URL
+
     async def send_request(
         self,
         origin: Coordinates,
@@ -42,9 +43,7 @@ class MapboxRequestHandler(BaseRequestHandler):
             "exclude": "ferry",  # by default I think it includes ferries, but for our API we use just driving, without ferries
         }
         try:
-            async with aiohttp.ClientSession(
-                timeout=self.default_timeout
-            ) as session, session.get(
+            async with self.session.get(
                 f"{self.MAPBOX_ROUTES_URL}/{transport_mode}/{route}", params=params
             ) as response:
                 data = await response.json()
@@ -60,10 +59,10 @@ class MapboxRequestHandler(BaseRequestHandler):
                     logger.error(
                         f"Error in Mapbox API response: {response.status} - {error_message}"
                     )
-                    return RequestResult(None)
+                    return RequestResult(None, failed=True)
         except Exception as e:
             logger.error(f"Exception during requesting Mapbox API, {e}")
-            return RequestResult(None)
+            return RequestResult(None, failed=True)
 
 
 def get_mapbox_specific_mode(mode: Mode) -> str:
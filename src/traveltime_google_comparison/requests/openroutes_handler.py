@@ -1,7 +1,7 @@
 import logging
 from datetime import datetime
+from typing import Optional
 
-import aiohttp
 from traveltimepy import Coordinates
 
 from traveltime_google_comparison.config import Mode
@@ -21,11 +21,14 @@ class OpenRoutesError(Exception):
 class OpenRoutesRequestHandler(BaseRequestHandler):
     OPEN_ROUTES_URL = "https://api.openrouteservice.org/v2/directions"
 
-    default_timeout = aiohttp.ClientTimeout(total=60)
-
-    def __init__(self, api_key, max_rpm):
+    def __init__(self, api_key, max_rpm, base_url: Optional[str] = None):
         self.api_key = api_key
         self._rate_limiter = create_async_limiter(max_rpm)
+        # Self-hosted instances serve the same API, e.g. http://localhost:8080/ors/v2/directions
+        self.base_url = (base_url or self.OPEN_ROUTES_URL).rstrip("/")
+
+    def warmup_url(self) -> Optional[str]:
+        return self.base_url
 
     async def send_request(
         self,
@@ -41,10 +44,8 @@ class OpenRoutesRequestHandler(BaseRequestHandler):
             "end": f"{destination.lng},{destination.lat}",
         }
         try:
-            async with aiohttp.ClientSession(
-                timeout=self.default_timeout
-            ) as session, session.get(
-                f"{self.OPEN_ROUTES_URL}/{transport_mode}", params=params
+            async with self.session.get(
+                f"{self.base_url}/{transport_mode}", params=params
             ) as response:
                 data = await response.json()
                 if response.status == 200:
@@ -61,10 +62,10 @@ class OpenRoutesRequestHandler(BaseRequestHandler):
                     logger.error(
                         f"Error in OpenRoutes API response: {response.status} - {error_message}"
                     )
-                    return RequestResult(None)
+                    return RequestResult(None, failed=True)
         except Exception as e:
             logger.error(f"Exception during requesting OpenRoutes API, {e}")
-            return RequestResult(None)
+            return RequestResult(None, failed=True)
 
 
 def get_open_routes_specific_mode(mode: Mode) -> str:
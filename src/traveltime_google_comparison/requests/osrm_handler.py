@@ -1,7 +1,7 @@
 import logging
 from datetime import datetime
+from typing import List, Optional
 
-import aiohttp
 from traveltimepy import Coordinates
 
 from traveltime_google_comparison.config import Mode
@@ -9,6 +9,7 @@ from traveltime_google_comparison.requests.base_handler import (
     BaseRequestHandler,
     RequestResult,
     create_async_limiter,
+    unique_coordinates,
 )
 
 logger = logging.getLogger(__name__)
@@ -19,13 +20,15 @@ class OSRMApiError(Exception):
 
 
 class OSRMRequestHandler(BaseRequestHandler):
-    OSRM_ROUTES_URL = "http://router.project-osrm.org/route/v1/"
+    OSRM_URL = "http://router.project-osrm.org"
 
-    default_timeout = aiohttp.ClientTimeout(total=60)
-
-    def __init__(self, api_key, max_rpm):
+    def __init__(self, api_key, max_rpm, base_url: Optional[str] = None):
         self.api_key = api_key
         self._rate_limiter = create_async_limiter(max_rpm)
+        self.base_url = (base_url or self.OSRM_URL).rstrip("/")
+
+    def warmup_url(self) -> Optional[str]:
+        return self.base_url
 
     async def send_request(
         self,
@@ -42,10 +45,8 @@ class OSRMRequestHandler(BaseRequestHandler):
         }
 
         try:
-            async with aiohttp.ClientSession(
-                timeout=self.default_timeout
-            ) as session, session.get(
-                f"{self.OSRM_ROUTES_URL}{transport_mode}/{route}", params=params
+            async with self.session.get(
+                f"{self.base_url}/route/v1/{transport_mode}/{route}", params=params
             ) as response:
                 data = await response.json()
                 if response.status == 200:
@@ -64,10 +65,60 @@ class OSRMRequestHandler(BaseRequestHandler):
                     logger.error(
                         f"Error in OSRM API response: {response.status} - {error_message}"
                     )
-                    return RequestResult(None)
+                    return RequestResult(None, failed=True)
+        except Exception as e:
+            logger.error(f"Exception during requesting OSRM API, {e}")
+            return RequestResult(None, failed=True)
+
+    async def send_batch_request(
+        self,
+        origins: List[Coordinates],
+        destinations: List[Coordinates],
+        departure_time: datetime,
+        mode: Mode,
+    ) -> List[RequestResult]:
+        # The table service returns a matrix of all sources to all destinations,
+        # so every distinct coordinate is sent once and the pairs are picked out of it
+        sources = unique_coordinates(origins)
+        targets = unique_coordinates(destinations)
+
+        route = ";".join(
+            f"{lng},{lat}" for lat, lng in list(sources) + list(targets)
+        )  # for OSRM lat/lng are flipped!
+        transport_mode = get_osrm_specific_mode(mode)
+        params = {
+            "sources": ";".join(str(index) for index in range(len(sources))),
+            "destinations": ";".join(
+                str(len(sources) + index) for index in range(len(targets))
+            ),
+            "annotations": "duration",
+        }
+
+        try:
+            async with self.session.get(
+                f"{self.base_url}/table/v1/{transport_mode}/{route}", params=params
+            ) as response:
+                data = await response.json()
+                if response.status == 200 and data.get("code") == "Ok":
+                    durations = data["durations"]
+                    results = []
+                    for origin, destination in zip(origins, destinations):
+                        duration = durations[sources[(origin.lat, origin.lng)]][
+                            targets[(destination.lat, destination.lng)]
+                        ]
+                        results.append(
+                            RequestResult(None if duration is None else int(duration))
+                        )
+                    return results
+                else:
+                    error_message = data.get("message", "")
+                    logger.error(
+                        f"Error in OSRM API response: {response.status} - {error_message}"
+                    )
+                    return [RequestResult(None, failed=True)] * len(origins)
         except Exception as e:
             logger.error(f"Exception during requesting OSRM API, {e}")
-            return RequestResult(None)
+            return [RequestResult(None, failed=True)] * len(origins)
 
 
 def get_osrm_specific_mode(mode: Mode) -> str:
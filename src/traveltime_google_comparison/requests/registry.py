@@ -0,0 +1,230 @@
+import logging
+from dataclasses import dataclass, field, replace
+from importlib.metadata import entry_points
+from typing import Callable, Dict, FrozenSet, List, Mapping
+
+from traveltime_google_comparison.config import (
+    DEFAULT_GOOGLE_RPM,
+    DEFAULT_HERE_RPM,
+    DEFAULT_MAPBOX_RPM,
+    DEFAULT_OPENROUTES_RPM,
+    DEFAULT_OSRM_RPM,
+    DEFAULT_TOMTOM_RPM,
+    DEFAULT_TRAVELTIME_RPM,
+    Mode,
+    Provider,
+    Providers,
+)
+from traveltime_google_comparison.requests.base_handler import BaseRequestHandler
+from traveltime_google_comparison.requests.google_handler import GoogleRequestHandler
+from traveltime_google_comparison.requests.here_handler import HereRequestHandler
+from traveltime_google_comparison.requests.mapbox_handler import MapboxRequestHandler
+from traveltime_google_comparison.requests.openroutes_handler import (
+    OpenRoutesRequestHandler,
+)
+from traveltime_google_comparison.requests.osrm_handler import OSRMRequestHandler
+from traveltime_google_comparison.requests.tomtom_handler import TomTomRequestHandler
+from traveltime_google_comparison.requests.traveltime_handler import (
+    TravelTimeRequestHandler,
+)
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_API = "google"
+TOMTOM_API = "tomtom"
+HERE_API = "here"
+OSRM_API = "osrm"
+MAPBOX_API = "mapbox"
+TRAVELTIME_API = "traveltime"
+OPENROUTES_API = "openroutes"
+
+# Third party packages register providers under this entry point group,
+# pointing at a `ProviderSpec` instance.
+PROVIDERS_ENTRY_POINT_GROUP = "traveltime_google_comparison.providers"
+
+
+@dataclass(frozen=True)
+class ProviderSpec:
+    name: str
+    display_name: str
+    output_column: str
+    handler_factory: Callable[[Provider], BaseRequestHandler]
+    modes: FrozenSet[Mode] = frozenset({Mode.DRIVING})
+    # How many origin/destination pairs a single request can carry, per mode.
+    # Modes missing here are sent one pair per request.
+    max_batch_size: Mapping[Mode, int] = field(default_factory=dict)
+    # One-to-many endpoints take a single origin per batch request
+    one_to_many: bool = False
+    # Requests departing in the past are refused instead of answered
+    rejects_past_departures: bool = False
+    # Time-invariant providers ignore the departure time, so every pair is requested once
+    time_dependent: bool = True
+    # Free providers are queried before paid ones with cost-ordered dispatch
+    paid: bool = True
+    default_max_rpm: int = 60
+
+    def batch_size(self, mode: Mode) -> int:
+        return self.max_batch_size.get(mode, 1)
+
+
+_registry: Dict[str, ProviderSpec] = {}
+_plugins_loaded = False
+
+
+def register_provider(spec: ProviderSpec):
+    if spec.name in _registry:
+        raise ValueError(f"API provider `{spec.name}` is already registered")
+    _registry[spec.name] = spec
+
+
+def get_provider_spec(name: str) -> ProviderSpec:
+    load_plugins()
+    if name not in _registry:
+        raise ValueError(f"Unsupported API provider: {name}")
+    return _registry[name]
+
+
+def registered_providers() -> List[ProviderSpec]:
+    load_plugins()
+    return list(_registry.values())
+
+
+def filter_providers_for_mode(providers: Providers, mode: Mode) -> Providers:
+    competitors = []
+    for competitor in providers.competitors:
+        spec = get_provider_spec(competitor.name)
+        if mode in spec.modes:
+            competitors.append(competitor)
+        else:
+            logger.warning(
+                f"{spec.display_name} API does not support `{mode.value}` mode, skipping it"
+            )
+
+    if len(competitors) == 0:
+        raise ValueError(
+            f"There should be at least one enabled API provider supporting `{mode.value}` mode."
+        )
+
+    return replace(providers, competitors=competitors)
+
+
+def load_plugins():
+    global _plugins_loaded
+    if _plugins_loaded:
+        return
+    _plugins_loaded = True
+
+    all_entry_points = entry_points()
+    if hasattr(all_entry_points, "select"):
+        provider_entry_points = all_entry_points.select(
+            group=PROVIDERS_ENTRY_POINT_GROUP
+        )
+    else:  # Python < 3.10 returns a dict of groups
+        provider_entry_points = all_entry_points.get(PROVIDERS_ENTRY_POINT_GROUP, [])
+
+    for entry_point in provider_entry_points:
+        spec = entry_point.load()
+        if not isinstance(spec, ProviderSpec):
+            raise TypeError(
+                f"Entry point `{entry_point.name}` must point at a ProviderSpec"
+            )
+        logger.debug(f"Registering API provider `{spec.name}` from {entry_point.value}")
+        register_provider(spec)
+
+
+register_provider(
+    ProviderSpec(
+        name=GOOGLE_API,
+        display_name="Google",
+        output_column="google_travel_time",
+        modes=frozenset({Mode.DRIVING, Mode.PUBLIC_TRANSPORT}),
+        handler_factory=lambda provider: GoogleRequestHandler(
+            provider.credentials.api_key, provider.max_rpm
+        ),
+        # Pairs sharing an origin go through the Distance Matrix API,
+        # which accepts up to 25 destinations per request
+        max_batch_size={Mode.DRIVING: 25, Mode.PUBLIC_TRANSPORT: 25},
+        one_to_many=True,
+        rejects_past_departures=True,
+        default_max_rpm=DEFAULT_GOOGLE_RPM,
+    )
+)
+register_provider(
+    ProviderSpec(
+        name=TOMTOM_API,
+        display_name="TomTom",
+        output_column="tomtom_travel_time",
+        handler_factory=lambda provider: TomTomRequestHandler(
+            provider.credentials.api_key, provider.max_rpm
+        ),
+        default_max_rpm=DEFAULT_TOMTOM_RPM,
+    )
+)
+register_provider(
+    ProviderSpec(
+        name=HERE_API,
+        display_name="HERE",
+        output_column="here_travel_time",
+        handler_factory=lambda provider: HereRequestHandler(
+            provider.credentials.api_key, provider.max_rpm
+        ),
+        default_max_rpm=DEFAULT_HERE_RPM,
+    )
+)
+register_provider(
+    ProviderSpec(
+        name=OSRM_API,
+        display_name="OSRM",
+        output_column="osrm_travel_time",
+        handler_factory=lambda provider: OSRMRequestHandler(
+            "", provider.max_rpm, provider.base_url
+        ),
+        # Batches go through the table service; 50 pairs stay within
+        # the 100 coordinates accepted by the public demo server
+        max_batch_size={Mode.DRIVING: 50},
+        time_dependent=False,
+        paid=False,
+        default_max_rpm=DEFAULT_OSRM_RPM,
+    )
+)
+register_provider(
+    ProviderSpec(
+        name=OPENROUTES_API,
+        display_name="OpenRoutes",
+        output_column="openroutes_travel_time",
+        handler_factory=lambda provider: OpenRoutesRequestHandler(
+            provider.credentials.api_key, provider.max_rpm, provider.base_url
+        ),
+        time_dependent=False,
+        paid=False,
+        default_max_rpm=DEFAULT_OPENROUTES_RPM,
+    )
+)
+register_provider(
+    ProviderSpec(
+        name=MAPBOX_API,
+        display_name="Mapbox",
+        output_column="mapbox_travel_time",
+        handler_factory=lambda provider: MapboxRequestHandler(
+            provider.credentials.api_key, provider.max_rpm
+        ),
+        default_max_rpm=DEFAULT_MAPBOX_RPM,
+    )
+)
+register_provider(
+    ProviderSpec(
+        name=TRAVELTIME_API,
+        display_name="TravelTime",
+        output_column="tt_travel_time",
+        modes=frozenset({Mode.DRIVING, Mode.PUBLIC_TRANSPORT}),
+        # Routes requests carry one search per origin, the API accepts up to 10 searches
+        max_batch_size={Mode.DRIVING: 10, Mode.PUBLIC_TRANSPORT: 10},
+        handler_factory=lambda provider: TravelTimeRequestHandler(
+            provider.credentials.app_id,
+            provider.credentials.api_key,
+            provider.max_rpm,
+            provider.base_url,
+        ),
+        default_max_rpm=DEFAULT_TRAVELTIME_RPM,
+    )
+)
@@ -1,7 +1,7 @@
 import logging
 from datetime import datetime
+from typing import Optional
 
-import aiohttp
 from traveltimepy import Coordinates
 
 from traveltime_google_comparison.config import Mode
@@ -21,12 +21,13 @@ class TomTomApiError(Exception):
 class TomTomRequestHandler(BaseRequestHandler):
     TOMTOM_ROUTING_URL = "https://api.tomtom.com/routing/1/calculateRoute/"
 
-    default_timeout = aiohttp.ClientTimeout(total=60)
-
     def __init__(self, api_key, max_rpm):
         self.api_key = api_key
         self._rate_limiter = create_async_limiter(max_rpm)
 
+    def warmup_url(self) -> Optional[str]:
+        return self.TOMTOM_ROUTING_URL
+
     async def send_request(
         self,
         origin: Coordinates,
@@ -41,9 +42,7 @@ class TomTomRequestHandler(BaseRequestHandler):
             "travelMode": get_tomtom_specific_mode(mode),
         }
         try:
-            async with aiohttp.ClientSession(
-                timeout=self.default_timeout
-            ) as session, session.get(
+            async with self.session.get(
                 f"{self.TOMTOM_ROUTING_URL}{route}/json", params=params
             ) as response:
                 data = await response.json()
@@ -61,10 +60,10 @@ class TomTomRequestHandler(BaseRequestHandler):
                     logger.error(
                         f"Error in TomTom API response: {response.status} - {error_message}"
                     )
-                    return RequestResult(None)
+                    return RequestResult(None, failed=True)
         except Exception as e:
             logger.error(f"Exception during requesting TomTom API, {e}")
-            return RequestResult(None)
+            return RequestResult(None, failed=True)
 
 
 def get_tomtom_specific_mode(mode: Mode) -> str:
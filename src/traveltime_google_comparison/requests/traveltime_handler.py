@@ -1,13 +1,10 @@
 from datetime import datetime
-from typing import Union
+from typing import Dict, List, Optional, Tuple, Union
 import logging
 
 from traveltimepy import (
-    Location,
     Coordinates,
-    TravelTimeSdk,
     Driving,
-    Property,
     PublicTransport,
 )
 from traveltimepy.dto.common import Snapping, SnappingPenalty, SnappingAcceptRoads
@@ -17,6 +14,7 @@ from traveltime_google_comparison.requests.base_handler import (
     BaseRequestHandler,
     RequestResult,
     create_async_limiter,
+    unique_coordinates,
 )
 
 logger = logging.getLogger(__name__)
@@ -25,12 +23,66 @@ logger = logging.getLogger(__name__)
 class TravelTimeRequestHandler(BaseRequestHandler):
     ORIGIN_ID = "o"
     DESTINATION_ID = "d"
+    TRAVELTIME_URL = "https://api.traveltimeapp.com"
+    USER_AGENT = "Travel Time Comparison Tool"
 
-    def __init__(self, app_id, api_key, max_rpm):
-        self.sdk = TravelTimeSdk(
-            app_id=app_id, api_key=api_key, user_agent="Travel Time Comparison Tool"
-        )
+    # Parts of every search which don't depend on the pairs, built once
+    SNAPPING = Snapping(
+        penalty=SnappingPenalty.DISABLED,
+        accept_roads=SnappingAcceptRoads.BOTH_DRIVABLE_AND_WALKABLE,
+    ).model_dump(mode="json")
+    PROPERTIES = ["travel_time"]
+
+    def __init__(
+        self,
+        app_id,
+        api_key,
+        max_rpm,
+        base_url: Optional[str] = None,
+        connection_limit: Optional[int] = None,
+    ):
         self._rate_limiter = create_async_limiter(max_rpm)
+        self.base_url = (base_url or self.TRAVELTIME_URL).rstrip("/")
+        if connection_limit is not None:
+            self.connection_limit = connection_limit
+        self.headers = {
+            "X-Application-Id": app_id,
+            "X-Api-Key": api_key,
+            "User-Agent": self.USER_AGENT,
+            "Content-Type": "application/json",
+            "Accept": "application/json",
+        }
+        self._search_templates = {
+            mode: {
+                "transportation": get_traveltime_specific_mode(mode).model_dump(
+                    mode="json", exclude_none=True
+                ),
+                "properties": self.PROPERTIES,
+                "snapping": self.SNAPPING,
+            }
+            for mode in Mode
+        }
+
+    def warmup_url(self) -> Optional[str]:
+        return f"{self.base_url}/v4/map-info"
+
+    async def warmup(self):
+        # Map info is a free call, so it also checks the credentials up front
+        try:
+            async with self.session.get(
+                self.warmup_url(), headers=self.headers
+            ) as response:
+                await response.read()
+                status = response.status
+        except Exception as e:
+            logger.warning(f"Could not warm up connections to {self.base_url}, {e}")
+            return
+
+        if status in (401, 403):
+            raise ValueError(
+                f"TravelTime API rejected the configured credentials ({status})"
+            )
+        await super().warmup()
 
     async def send_request(
         self,
@@ -39,38 +91,106 @@ class TravelTimeRequestHandler(BaseRequestHandler):
         departure_time: datetime,
         mode: Mode,
     ) -> RequestResult:
-        locations = [
-            Location(id=self.ORIGIN_ID, coords=origin),
-            Location(id=self.DESTINATION_ID, coords=destination),
-        ]
-        results = None
+        results = await self.send_batch_request(
+            [origin], [destination], departure_time, mode
+        )
+        return results[0]
+
+    async def send_batch_request(
+        self,
+        origins: List[Coordinates],
+        destinations: List[Coordinates],
+        departure_time: datetime,
+        mode: Mode,
+    ) -> List[RequestResult]:
+        body, pair_ids = self.build_routes_request(
+            origins, destinations, departure_time, mode
+        )
         try:
-            results = await self.sdk.routes_async(
-                locations=locations,
-                search_ids={
-                    self.ORIGIN_ID: [self.DESTINATION_ID],
-                },
-                transportation=get_traveltime_specific_mode(mode),
-                departure_time=departure_time,
-                properties=[Property.TRAVEL_TIME],
-                snapping=Snapping(
-                    penalty=SnappingPenalty.DISABLED,
-                    accept_roads=SnappingAcceptRoads.BOTH_DRIVABLE_AND_WALKABLE,
-                ),
-            )
+            async with self.session.post(
+                f"{self.base_url}/v4/routes", json=body, headers=self.headers
+            ) as response:
+                data = await response.json()
+                if response.status != 200:
+                    logger.error(
+                        f"Error in TravelTime API response: {response.status} - "
+                        f"{data.get('description', '')}"
+                    )
+                    return [RequestResult(None, failed=True)] * len(pair_ids)
         except Exception as e:
             logger.error(f"Exception during requesting TravelTime API, {e}")
-            return RequestResult(None)
+            return [RequestResult(None, failed=True)] * len(pair_ids)
+
+        return parse_routes_response(data, pair_ids)
+
+    def build_routes_request(
+        self,
+        origins: List[Coordinates],
+        destinations: List[Coordinates],
+        departure_time: datetime,
+        mode: Mode,
+    ) -> Tuple[dict, List[Tuple[str, str]]]:
+        """
+        Routes request with one departure search per distinct origin, each towards all
+        destinations paired with it. Returns the request body and the
+        (search id, location id) of every pair.
+        """
+        origin_ids = {
+            coordinates: f"{self.ORIGIN_ID}{index}"
+            for coordinates, index in unique_coordinates(origins).items()
+        }
+        destination_ids = {
+            coordinates: f"{self.DESTINATION_ID}{index}"
+            for coordinates, index in unique_coordinates(destinations).items()
+        }
+        locations = [
+            {"id": location_id, "coords": {"lat": lat, "lng": lng}}
+            for ids in (origin_ids, destination_ids)
+            for (lat, lng), location_id in ids.items()
+        ]
+        pair_ids = [
+            (
+                origin_ids[(origin.lat, origin.lng)],
+                destination_ids[(destination.lat, destination.lng)],
+            )
+            for origin, destination in zip(origins, destinations)
+        ]
+        search_ids: Dict[str, List[str]] = {}
+        for origin_id, destination_id in pair_ids:
+            destinations_of_origin = search_ids.setdefault(origin_id, [])
+            if destination_id not in destinations_of_origin:
+                destinations_of_origin.append(destination_id)
+
+        template = self._search_templates[mode]
+        departure_time_str = departure_time.isoformat()
+        searches = [
+            {
+                "id": origin_id,
+                "departure_location_id": origin_id,
+                "arrival_location_ids": arrival_ids,
+                "departure_time": departure_time_str,
+                **template,
+            }
+            for origin_id, arrival_ids in search_ids.items()
+        ]
+        body = {
+            "locations": locations,
+            "departure_searches": searches,
+            "arrival_searches": [],
+        }
+        return body, pair_ids
 
-        if (
-            not results
-            or not results[0].locations
-            or not results[0].locations[0].properties
-        ):
-            return RequestResult(None)
 
-        properties = results[0].locations[0].properties[0]
-        return RequestResult(travel_time=properties.travel_time)
+def parse_routes_response(
+    data: dict, pair_ids: List[Tuple[str, str]]
+) -> List[RequestResult]:
+    travel_times = {
+        (result["search_id"], location["id"]): location["properties"][0]["travel_time"]
+        for result in data.get("results", [])
+        for location in result.get("locations", [])
+        if location.get("properties")
+    }
+    return [RequestResult(travel_times.get(pair_id)) for pair_id in pair_ids]
 
 
 class RouteNotFoundError(Exception):
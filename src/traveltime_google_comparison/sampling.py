@@ -0,0 +1,169 @@
+import logging
+import math
+from dataclasses import dataclass
+from statistics import NormalDist
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from pandas import DataFrame
+
+from traveltime_google_comparison import profiling
+from traveltime_google_comparison.collect import (
+    DepartureDeadlines,
+    ResultCache,
+    ResultStore,
+    dispatch,
+    get_capitalized_provider_name,
+    get_time_instants,
+    log_skipped_requests,
+    parse_pair_coordinates,
+)
+from traveltime_google_comparison.requests.base_handler import BaseRequestHandler
+from traveltime_google_comparison.requests.registry import TRAVELTIME_API
+
+logger = logging.getLogger(__name__)
+
+CONFIDENCE = 0.95
+# Below this many results the normal approximation of the order statistics is too rough
+MIN_SAMPLES = 30
+
+
+def quantile_confidence_interval(
+    values: np.ndarray, quantile: float, confidence: float = CONFIDENCE
+) -> Tuple[float, float]:
+    """
+    Distribution free confidence interval of a quantile, bounded by the order statistics
+    whose ranks are the normal approximation of the binomial interval around `n * quantile`.
+    """
+    n = len(values)
+    if n == 0:
+        return -math.inf, math.inf
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    spread = z * math.sqrt(n * quantile * (1 - quantile))
+    # Ranks are 1-based, array positions 0-based
+    lower_rank = math.floor(n * quantile - spread)
+    upper_rank = math.ceil(n * quantile + spread)
+    if lower_rank < 1 or upper_rank > n:
+        return -math.inf, math.inf
+
+    ordered = np.sort(values)
+    return float(ordered[lower_rank - 1]), float(ordered[upper_rank - 1])
+
+
+@dataclass
+class QuantileEstimate:
+    provider: str
+    samples: int
+    low: float
+    high: float
+
+    @property
+    def width(self) -> float:
+        return self.high - self.low
+
+
+def estimate_quantiles(
+    store: ResultStore,
+    requested: np.ndarray,
+    competitors: List[str],
+    quantile: float,
+) -> List[QuantileEstimate]:
+    """Relative error quantile intervals over the keys requested so far, as in `analysis`."""
+    baseline = store.provider_names.index(TRAVELTIME_API)
+    estimates = []
+    for provider in competitors:
+        index = store.provider_names.index(provider)
+        valid = (
+            requested
+            & ~store.missing[:, :, baseline]
+            & ~store.missing[:, :, index]
+            & (store.travel_times[:, :, index] != 0)
+        )
+        travel_times = store.travel_times[:, :, index][valid].astype(np.float64)
+        baseline_travel_times = store.travel_times[:, :, baseline][valid]
+        relative_errors = (
+            np.abs(travel_times - baseline_travel_times) / travel_times * 100
+        )
+        low, high = quantile_confidence_interval(relative_errors, quantile)
+        estimates.append(QuantileEstimate(provider, len(relative_errors), low, high))
+    return estimates
+
+
+def converged(estimates: List[QuantileEstimate], target_width: float) -> bool:
+    return all(
+        estimate.samples >= MIN_SAMPLES and estimate.width <= target_width
+        for estimate in estimates
+    )
+
+
+async def collect_sampled_travel_times(
+    args,
+    data: DataFrame,
+    request_handlers: Dict[str, BaseRequestHandler],
+    provider_names: List[str],
+    quantile: float,
+    cache: Optional[ResultCache] = None,
+) -> DataFrame:
+    """
+    Requests (pair, departure time) keys in random order, in rounds of `args.sample_round_size`,
+    and stops once the relative error quantile interval of every competitor
+    is narrower than `args.target_ci_width` percentage points.
+    """
+    time_instants = get_time_instants(args)
+    store = ResultStore(data, time_instants, provider_names)
+    cache = cache if cache is not None else ResultCache()
+    deadlines = DepartureDeadlines(request_handlers)
+    competitors = [name for name in provider_names if name != TRAVELTIME_API]
+    origins, destinations = parse_pair_coordinates(data)
+
+    keys_count = len(data) * len(time_instants)
+    order = np.random.default_rng(args.sample_seed).permutation(keys_count)
+    requested = np.zeros((len(data), len(time_instants)), dtype=bool)
+
+    estimates: List[QuantileEstimate] = []
+    for start in range(0, keys_count, args.sample_round_size):
+        end = start + args.sample_round_size
+        round_keys = order[start:end]
+        pair_indices, time_indices = np.divmod(round_keys, len(time_instants))
+        requested[pair_indices, time_indices] = True
+
+        # Sorting by pair keeps pairs sharing an origin batchable within a round
+        pairs_per_time = [
+            np.sort(pair_indices[time_indices == time_index]).tolist()
+            for time_index in range(len(time_instants))
+        ]
+        stats = await dispatch(
+            origins,
+            destinations,
+            time_instants,
+            request_handlers,
+            args.mode,
+            store,
+            cache,
+            deadlines,
+            pairs_per_time=pairs_per_time,
+            cost_ordered=args.cost_ordered,
+        )
+        log_skipped_requests(stats)
+
+        estimates = estimate_quantiles(store, requested, competitors, quantile)
+        logger.info(
+            f"Sampled {start + len(round_keys)} of {keys_count} pairs and departure times: "
+            + ", ".join(
+                f"{get_capitalized_provider_name(estimate.provider)} "
+                f"{int(quantile * 100)}th percentile error within "
+                f"{estimate.low:.1f}-{estimate.high:.1f}%"
+                for estimate in estimates
+            )
+        )
+        if converged(estimates, args.target_ci_width):
+            logger.info(
+                f"Confidence intervals are narrower than {args.target_ci_width} percentage points, "
+                f"stopped after {start + len(round_keys)} of {keys_count} pairs and departure times"
+            )
+            break
+
+    with profiling.stage(profiling.BUILD_RESULTS):
+        results = store.to_dataframe(requested)
+        results.to_csv(args.output, index=False)
+    return results
@@ -0,0 +1,78 @@
+import asyncio
+
+from aiohttp import web
+from traveltimepy import Coordinates
+
+from traveltime_google_comparison.requests.base_handler import (
+    BaseRequestHandler,
+    UnlimitedLimiter,
+    create_async_limiter,
+    unique_coordinates,
+)
+
+
+def test_create_async_limiter_for_fractional_rate():
+    limiter = create_async_limiter(20)
+    assert limiter.max_rate == 1
+    assert limiter.time_period == 3
+
+
+def test_create_async_limiter_without_max_rpm_is_unlimited():
+    limiter = create_async_limiter(None)
+    assert isinstance(limiter, UnlimitedLimiter)
+
+    async def acquire_many():
+        for _ in range(10_000):
+            async with limiter:
+                pass
+
+    asyncio.run(asyncio.wait_for(acquire_many(), timeout=5))
+
+
+def test_unique_coordinates_keeps_order_of_appearance():
+    coordinates = [
+        Coordinates(lat=51.1, lng=0.1),
+        Coordinates(lat=51.2, lng=0.2),
+        Coordinates(lat=51.1, lng=0.1),
+    ]
+    assert unique_coordinates(coordinates) == {(51.1, 0.1): 0, (51.2, 0.2): 1}
+
+
+class WarmupHandler(BaseRequestHandler):
+    def __init__(self, url):
+        self.url = url
+        self._rate_limiter = create_async_limiter(60)
+
+    def warmup_url(self):
+        return self.url
+
+    async def send_request(self, origin, destination, departure_time, mode):
+        pass
+
+
+async def respond_ok(request):
+    return web.Response(text="ok")
+
+
+def test_warmup_opens_pooled_connections():
+    async def warmup():
+        app = web.Application()
+        app.router.add_route("HEAD", "/", respond_ok)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = runner.addresses[0][1]
+
+        handler = WarmupHandler(f"http://127.0.0.1:{port}/")
+        try:
+            await handler.warmup()
+            return sum(
+                len(connections)
+                for connections in handler.session.connector._conns.values()
+            )
+        finally:
+            await handler.close()
+            await runner.cleanup()
+
+    assert asyncio.run(warmup()) == WarmupHandler.warmup_connections
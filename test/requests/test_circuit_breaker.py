@@ -0,0 +1,80 @@
+import asyncio
+
+from aiolimiter import AsyncLimiter
+
+from traveltime_google_comparison.requests.base_handler import UnlimitedLimiter
+from traveltime_google_comparison.requests.circuit_breaker import (
+    BreakerPolicy,
+    BreakerState,
+    CircuitBreaker,
+)
+
+
+def test_circuit_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker("Google", consecutive_failures=3, window=10)
+
+    breaker.record(True)
+    breaker.record(True)
+    breaker.record(False)
+    breaker.record(True)
+    breaker.record(True)
+    assert breaker.state == BreakerState.CLOSED
+
+    breaker.record(True)
+    assert breaker.state == BreakerState.OPEN
+
+
+def test_circuit_breaker_opens_on_error_rate_over_the_window():
+    breaker = CircuitBreaker(
+        "Google", consecutive_failures=10, error_rate=0.5, window=4
+    )
+
+    for failed in [True, False, True]:
+        breaker.record(failed)
+    assert breaker.state == BreakerState.CLOSED
+
+    breaker.record(False)
+    assert breaker.state == BreakerState.OPEN
+
+
+def test_paused_circuit_breaker_holds_requests_until_a_probe_succeeds():
+    async def run():
+        breaker = CircuitBreaker("Google", consecutive_failures=1, cooldown=0.01)
+        limiter = UnlimitedLimiter()
+        breaker.record(True)
+
+        held = asyncio.ensure_future(breaker.acquire(limiter))
+        await asyncio.sleep(0)
+        assert not held.done()
+
+        # The first request after the cooldown is the probe; a failed one reopens
+        assert await breaker.acquire(limiter)
+        assert breaker.state == BreakerState.HALF_OPEN
+        breaker.record(True)
+        assert breaker.state == BreakerState.OPEN
+
+        assert await breaker.acquire(limiter)
+        breaker.record(False)
+        assert breaker.state == BreakerState.CLOSED
+        return await asyncio.wait_for(held, timeout=1)
+
+    assert asyncio.run(run())
+
+
+def test_dropped_circuit_breaker_skips_requests_waiting_for_the_rate_limiter():
+    async def run():
+        breaker = CircuitBreaker("Google", BreakerPolicy.DROP, consecutive_failures=1)
+        limiter = AsyncLimiter(max_rate=1, time_period=60)
+
+        assert await breaker.acquire(limiter)
+        queued = asyncio.ensure_future(breaker.acquire(limiter))
+        await asyncio.sleep(0)
+        breaker.record(True)
+
+        return await asyncio.wait_for(queued, timeout=1), breaker
+
+    skipped, breaker = asyncio.run(run())
+
+    assert not skipped
+    assert breaker.dropped
+    assert breaker.short_circuited == 1
@@ -3,7 +3,9 @@ from enum import Enum
 import pytest
 
 from traveltime_google_comparison.config import Mode
+from traveltime_google_comparison.requests.base_handler import RequestResult
 from traveltime_google_comparison.requests.google_handler import (
+    GoogleRequestHandler,
     get_google_specific_mode,
 )
 
@@ -24,3 +26,19 @@ def test_get_google_specific_mode_for_unsupported_mode():
 
     with pytest.raises(ValueError, match=r"Unsupported mode: `WALKING`"):
         get_google_specific_mode(MockMode.WALKING)
+
+
+def test_parse_distance_matrix_element_prefers_duration_in_traffic():
+    handler = GoogleRequestHandler("test", 60)
+
+    assert handler._parse_element(
+        {
+            "status": "OK",
+            "duration": {"value": 100},
+            "duration_in_traffic": {"value": 120},
+        }
+    ) == RequestResult(120)
+    assert handler._parse_element(
+        {"status": "OK", "duration": {"value": 100}}
+    ) == RequestResult(100)
+    assert handler._parse_element({"status": "ZERO_RESULTS"}) == RequestResult(None)
@@ -0,0 +1,9 @@
+from traveltime_google_comparison.requests.osrm_handler import OSRMRequestHandler
+
+
+def test_osrm_handler_uses_configured_base_url():
+    assert OSRMRequestHandler("", 60).base_url == "http://router.project-osrm.org"
+    assert (
+        OSRMRequestHandler("", None, "http://localhost:5000/").base_url
+        == "http://localhost:5000"
+    )
@@ -0,0 +1,123 @@
+from importlib.metadata import EntryPoint
+
+import pytest
+
+from traveltime_google_comparison.collect import (
+    Fields,
+    get_capitalized_provider_name,
+)
+from traveltime_google_comparison.config import Mode, Provider, Providers
+from traveltime_google_comparison.requests import registry
+from traveltime_google_comparison.requests.google_handler import GoogleRequestHandler
+from traveltime_google_comparison.requests.registry import (
+    ProviderSpec,
+    filter_providers_for_mode,
+    get_provider_spec,
+    register_provider,
+)
+from traveltime_google_comparison.requests.traveltime_credentials import (
+    Credentials,
+)
+
+VALHALLA_SPEC = ProviderSpec(
+    name="valhalla",
+    display_name="Valhalla",
+    output_column="valhalla_travel_time",
+    handler_factory=lambda provider: GoogleRequestHandler(
+        provider.credentials.api_key, provider.max_rpm
+    ),
+    max_batch_size={Mode.DRIVING: 50},
+    default_max_rpm=6000,
+)
+
+
+@pytest.fixture
+def isolated_registry(monkeypatch):
+    monkeypatch.setattr(registry, "_registry", dict(registry._registry))
+    monkeypatch.setattr(registry, "_plugins_loaded", True)
+
+
+def test_built_in_providers_are_registered():
+    assert get_capitalized_provider_name("here") == "HERE"
+    assert Fields.TRAVEL_TIME["traveltime"] == "tt_travel_time"
+    assert "openroutes" in Fields.TRAVEL_TIME
+
+
+def test_unknown_provider_raises_error():
+    with pytest.raises(ValueError, match=r"Unsupported API provider: valhalla"):
+        get_provider_spec("valhalla")
+
+
+def test_registered_provider_is_used_everywhere(isolated_registry):
+    register_provider(VALHALLA_SPEC)
+
+    assert get_capitalized_provider_name("valhalla") == "Valhalla"
+    assert Fields.TRAVEL_TIME["valhalla"] == "valhalla_travel_time"
+
+    handler = get_provider_spec("valhalla").handler_factory(
+        Provider(name="valhalla", max_rpm=6000, credentials=Credentials("key"))
+    )
+    assert isinstance(handler, GoogleRequestHandler)
+
+
+def test_registering_provider_twice_raises_error(isolated_registry):
+    with pytest.raises(ValueError, match=r"`google` is already registered"):
+        register_provider(get_provider_spec("google"))
+
+
+def test_load_plugins_registers_entry_points(isolated_registry, monkeypatch):
+    monkeypatch.setattr(registry, "_plugins_loaded", False)
+    entry_point = EntryPoint(
+        name="valhalla",
+        value="test.requests.test_registry:VALHALLA_SPEC",
+        group=registry.PROVIDERS_ENTRY_POINT_GROUP,
+    )
+    monkeypatch.setattr(
+        registry, "entry_points", lambda: {entry_point.group: [entry_point]}
+    )
+    monkeypatch.setattr(EntryPoint, "load", lambda self: VALHALLA_SPEC)
+
+    assert get_provider_spec("valhalla") == VALHALLA_SPEC
+
+
+def test_batch_size_defaults_to_one_pair_per_request():
+    assert get_provider_spec("osrm").batch_size(Mode.DRIVING) == 50
+    assert get_provider_spec("tomtom").batch_size(Mode.DRIVING) == 1
+
+
+def test_filter_providers_for_mode_skips_unsupported_providers():
+    providers = Providers(
+        base=Provider(
+            name="traveltime",
+            max_rpm=60,
+            credentials=Credentials(app_id="test", api_key="test"),
+        ),
+        competitors=[
+            Provider(name="google", max_rpm=60, credentials=Credentials("test")),
+            Provider(name="mapbox", max_rpm=60, credentials=Credentials("test")),
+        ],
+    )
+
+    assert filter_providers_for_mode(providers, Mode.DRIVING) == providers
+    assert [
+        competitor.name
+        for competitor in filter_providers_for_mode(
+            providers, Mode.PUBLIC_TRANSPORT
+        ).competitors
+    ] == ["google"]
+
+
+def test_filter_providers_for_mode_without_supporting_providers_raises_error():
+    providers = Providers(
+        base=Provider(
+            name="traveltime",
+            max_rpm=60,
+            credentials=Credentials(app_id="test", api_key="test"),
+        ),
+        competitors=[
+            Provider(name="osrm", max_rpm=60, credentials=Credentials("test")),
+        ],
+    )
+
+    with pytest.raises(ValueError, match=r"supporting `public_transport` mode"):
+        filter_providers_for_mode(providers, Mode.PUBLIC_TRANSPORT)
@@ -1,11 +1,17 @@
+import asyncio
+from datetime import datetime
 from enum import Enum
 
 import pytest
-from traveltimepy import Driving, PublicTransport
+from aiohttp import web
+from traveltimepy import Coordinates, Driving, PublicTransport
 
 from traveltime_google_comparison.config import Mode
+from traveltime_google_comparison.requests.base_handler import RequestResult
 from traveltime_google_comparison.requests.traveltime_handler import (
+    TravelTimeRequestHandler,
     get_traveltime_specific_mode,
+    parse_routes_response,
 )
 
 
@@ -26,3 +32,88 @@ def test_get_traveltime_specific_mode_for_unsupported_mode():
 
     with pytest.raises(ValueError, match=r"Unsupported mode `WALKING`"):
         get_traveltime_specific_mode(MockMode.WALKING)
+
+
+def test_build_routes_request_sends_one_search_per_origin():
+    handler = TravelTimeRequestHandler("test", "test", 60)
+    origins = [
+        Coordinates(lat=51.1, lng=0.1),
+        Coordinates(lat=51.1, lng=0.1),
+        Coordinates(lat=51.2, lng=0.2),
+    ]
+    destinations = [
+        Coordinates(lat=51.3, lng=0.3),
+        Coordinates(lat=51.4, lng=0.4),
+        Coordinates(lat=51.3, lng=0.3),
+    ]
+
+    body, pair_ids = handler.build_routes_request(
+        origins, destinations, datetime(2023, 9, 5, 12, 0), Mode.PUBLIC_TRANSPORT
+    )
+
+    assert pair_ids == [("o0", "d0"), ("o0", "d1"), ("o1", "d0")]
+    assert [location["id"] for location in body["locations"]] == [
+        "o0",
+        "o1",
+        "d0",
+        "d1",
+    ]
+    assert body["departure_searches"][0] == {
+        "id": "o0",
+        "departure_location_id": "o0",
+        "arrival_location_ids": ["d0", "d1"],
+        "departure_time": "2023-09-05T12:00:00",
+        "transportation": {"type": "public_transport"},
+        "properties": ["travel_time"],
+        "snapping": {
+            "penalty": "disabled",
+            "accept_roads": "both_drivable_and_walkable",
+        },
+    }
+    assert body["departure_searches"][1]["arrival_location_ids"] == ["d0"]
+
+
+def test_parse_routes_response_maps_results_to_pairs():
+    data = {
+        "results": [
+            {
+                "search_id": "o0",
+                "locations": [
+                    {"id": "d0", "properties": [{"travel_time": 100}]},
+                    {"id": "d1", "properties": [{"travel_time": 200}]},
+                ],
+                "unreachable": [],
+            },
+            {"search_id": "o1", "locations": [], "unreachable": ["d0"]},
+        ]
+    }
+
+    results = parse_routes_response(data, [("o0", "d0"), ("o0", "d1"), ("o1", "d0")])
+
+    assert results == [RequestResult(100), RequestResult(200), RequestResult(None)]
+
+
+def test_warmup_rejects_invalid_credentials():
+    async def map_info(request):
+        return web.json_response({"description": "Invalid credentials"}, status=401)
+
+    async def warmup():
+        app = web.Application()
+        app.router.add_get("/v4/map-info", map_info)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = runner.addresses[0][1]
+
+        handler = TravelTimeRequestHandler(
+            "test", "test", 60, f"http://127.0.0.1:{port}"
+        )
+        try:
+            await handler.warmup()
+        finally:
+            await handler.close()
+            await runner.cleanup()
+
+    with pytest.raises(ValueError, match="rejected the configured credentials"):
+        asyncio.run(warmup())
@@ -1,7 +1,13 @@
 import pandas as pd
+import pytest
+
 from traveltime_google_comparison.analysis import (
+    DISTANCE_BAND,
+    PROVIDER,
+    TIME_BAND,
     QuantileErrorResult,
     absolute_error,
+    calculate_band_statistics,
     calculate_differences,
     calculate_quantiles,
     relative_error,
@@ -96,3 +102,30 @@ def test_calculate_quantiles_for_unsorted_list():
     assert calculate_quantiles(
         random_order_df, 0.75, GOOGLE_API
     ) == QuantileErrorResult(40, 20)
+
+
+def test_calculate_band_statistics_groups_errors_by_distance_and_time_of_day():
+    data = {
+        Fields.ORIGIN: ["51.5, -0.1", "51.5, -0.1", "51.5, -0.1", "51.5, -0.1"],
+        Fields.DESTINATION: ["51.51, -0.1", "51.51, -0.1", "51.9, -0.1", "51.9, -0.1"],
+        Fields.DEPARTURE_TIME: [
+            "2023-09-05 08:00:00+0100",
+            "2023-09-05 17:30:00+0100",
+            "2023-09-05 08:15:00+0100",
+            "2023-09-05 09:00:00+0100",
+        ],
+        Fields.TRAVEL_TIME[GOOGLE_API]: [100, 100, 1000, 1000],
+        Fields.TRAVEL_TIME[TRAVELTIME_API]: [110, 120, 1100, 1300],
+    }
+    results_with_differences = calculate_differences(pd.DataFrame(data), PROVIDERS)
+
+    band_statistics = calculate_band_statistics(
+        results_with_differences, 0.5, PROVIDERS, [0, 5, 100], [0, 12, 24]
+    )
+
+    assert band_statistics[PROVIDER].tolist() == [GOOGLE_API] * 3
+    assert [band.left for band in band_statistics[DISTANCE_BAND]] == [0, 0, 5]
+    assert [band.left for band in band_statistics[TIME_BAND]] == [0, 12, 0]
+    assert band_statistics["count"].tolist() == [1, 1, 2]
+    assert band_statistics["mean"].tolist() == pytest.approx([10.0, 20.0, 20.0])
+    assert band_statistics["quantile"].tolist() == pytest.approx([10.0, 20.0, 30.0])
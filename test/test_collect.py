@@ -1,11 +1,33 @@
+import asyncio
+from typing import List
+
 import pytest
 from datetime import datetime
 
+import pandas as pd
 import pytz
 from traveltimepy import Coordinates
 
+from traveltime_google_comparison.config import Mode
+from traveltime_google_comparison.requests.base_handler import (
+    BaseRequestHandler,
+    RequestResult,
+    create_async_limiter,
+)
+
 from traveltime_google_comparison.collect import (
+    GOOGLE_API,
+    OSRM_API,
+    TRAVELTIME_API,
+    DepartureDeadlines,
+    Fields,
+    ResultCache,
+    ResultStore,
+    batch_pairs,
+    dispatch,
+    generate_pair_tasks,
     generate_time_instants,
+    parse_pair_coordinates,
     parse_coordinates,
     localize_datetime,
 )
@@ -115,3 +137,217 @@ def test_localize_datetime_with_incorrect_format():
         wrong_time = "3:00 PM"
         timezone = pytz.timezone("US/Pacific")
         localize_datetime(date, wrong_time, timezone)
+
+
+def test_result_store_builds_one_row_per_pair_and_departure_time():
+    pairs = pd.DataFrame(
+        {
+            Fields.ORIGIN: ["51.1, 0.1", "51.2, 0.2"],
+            Fields.DESTINATION: ["51.3, 0.3", "51.4, 0.4"],
+        }
+    )
+    time_instants = [
+        pytz.UTC.localize(datetime(2023, 9, 5, 12, 0)),
+        pytz.UTC.localize(datetime(2023, 9, 5, 13, 0)),
+    ]
+    store = ResultStore(pairs, time_instants, [TRAVELTIME_API, GOOGLE_API])
+
+    store.set(0, 1, TRAVELTIME_API, 100)
+    store.set(0, 1, GOOGLE_API, 110)
+    store.set(1, 0, GOOGLE_API, None)
+    store.set(1, 0, TRAVELTIME_API, 200)
+
+    results = store.to_dataframe()
+
+    assert results[Fields.ORIGIN].tolist() == ["51.1, 0.1"] * 2 + ["51.2, 0.2"] * 2
+    assert (
+        results[Fields.DEPARTURE_TIME].tolist()
+        == [
+            "2023-09-05 12:00:00+0000",
+            "2023-09-05 13:00:00+0000",
+        ]
+        * 2
+    )
+    assert results[Fields.TRAVEL_TIME[TRAVELTIME_API]].tolist() == [
+        pd.NA,
+        100,
+        200,
+        pd.NA,
+    ]
+    assert results[Fields.TRAVEL_TIME[GOOGLE_API]].tolist() == [
+        pd.NA,
+        110,
+        pd.NA,
+        pd.NA,
+    ]
+
+
+def test_batch_pairs_groups_pairs_by_origin():
+    origins = [
+        Coordinates(lat=51.1, lng=0.1),
+        Coordinates(lat=51.2, lng=0.2),
+        Coordinates(lat=51.1, lng=0.1),
+        Coordinates(lat=51.1, lng=0.1),
+    ]
+
+    assert batch_pairs(origins, 2, one_to_many=False) == [[0, 2], [3, 1]]
+    assert batch_pairs(origins, 2, one_to_many=True) == [[0, 2], [3], [1]]
+    assert batch_pairs(origins, 1, one_to_many=False) == [[0], [2], [3], [1]]
+
+
+def test_result_cache_sends_one_request_per_key():
+    calls = []
+
+    async def fetch() -> RequestResult:
+        calls.append(1)
+        await asyncio.sleep(0)
+        return RequestResult(100)
+
+    async def run():
+        cache = ResultCache()
+        key = ResultCache.key(
+            GOOGLE_API,
+            Mode.DRIVING,
+            Coordinates(lat=51.1, lng=0.1),
+            Coordinates(lat=51.2, lng=0.2),
+            datetime(2023, 9, 5, 12, 0),
+        )
+        results = await asyncio.gather(
+            *[cache.get_or_fetch(key, fetch) for _ in range(3)]
+        )
+        return cache, results
+
+    cache, results = asyncio.run(run())
+
+    assert len(calls) == 1
+    assert cache.hits == 2
+    assert [result.travel_time for result in results] == [100] * 3
+
+
+def test_result_cache_does_not_keep_failed_requests():
+    async def fetch() -> RequestResult:
+        return RequestResult(None)
+
+    async def run():
+        cache = ResultCache(max_size=1)
+        key = ResultCache.key(
+            GOOGLE_API,
+            Mode.DRIVING,
+            Coordinates(lat=51.1, lng=0.1),
+            Coordinates(lat=51.2, lng=0.2),
+            datetime(2023, 9, 5, 12, 0),
+        )
+        await cache.get_or_fetch(key, fetch)
+        return key in cache
+
+    assert not asyncio.run(run())
+
+
+def test_departure_deadlines_skip_past_departures_for_rejecting_providers():
+    deadlines = DepartureDeadlines([TRAVELTIME_API, GOOGLE_API])
+    past = pytz.UTC.localize(datetime(2023, 9, 5, 12, 0))
+    future = pytz.UTC.localize(datetime(2100, 9, 5, 12, 0))
+
+    assert deadlines.expired(GOOGLE_API, past)
+    assert not deadlines.expired(GOOGLE_API, future)
+    assert not deadlines.expired(TRAVELTIME_API, past)
+    assert deadlines.skipped == 1
+
+
+class CountingHandler(BaseRequestHandler):
+    def __init__(self, fails_south_of: float = 0):
+        self._rate_limiter = create_async_limiter(None)
+        self.fails_south_of = fails_south_of
+        self.departure_times: List[datetime] = []
+
+    def travel_time(self, origin: Coordinates) -> RequestResult:
+        if origin.lat < self.fails_south_of:
+            return RequestResult(None)
+        return RequestResult(int(origin.lat * 10))
+
+    async def send_request(self, origin, destination, departure_time, mode):
+        self.departure_times.append(departure_time)
+        return self.travel_time(origin)
+
+    async def send_batch_request(self, origins, destinations, departure_time, mode):
+        self.departure_times.extend([departure_time] * len(origins))
+        return [self.travel_time(origin) for origin in origins]
+
+
+def test_time_invariant_providers_are_requested_once_per_pair():
+    pairs = pd.DataFrame(
+        {
+            Fields.ORIGIN: ["51.1, 0.1", "52.2, 0.2"],
+            Fields.DESTINATION: ["51.3, 0.3", "51.4, 0.4"],
+        }
+    )
+    time_instants = [
+        pytz.UTC.localize(datetime(2100, 9, 5, 12, 0)),
+        pytz.UTC.localize(datetime(2100, 9, 5, 13, 0)),
+        pytz.UTC.localize(datetime(2100, 9, 5, 14, 0)),
+    ]
+    handlers = {TRAVELTIME_API: CountingHandler(), OSRM_API: CountingHandler()}
+    store = ResultStore(pairs, time_instants, list(handlers))
+    origins, destinations = parse_pair_coordinates(pairs)
+
+    async def run():
+        tasks = generate_pair_tasks(
+            origins,
+            destinations,
+            time_instants,
+            handlers,
+            Mode.DRIVING,
+            store,
+            ResultCache(),
+            DepartureDeadlines(handlers),
+        )
+        await asyncio.gather(*tasks)
+
+    asyncio.run(run())
+
+    assert len(handlers[TRAVELTIME_API].departure_times) == 6
+    assert handlers[OSRM_API].departure_times == [time_instants[0]] * 2
+    results = store.to_dataframe()
+    assert results[Fields.TRAVEL_TIME[OSRM_API]].tolist() == [511] * 3 + [522] * 3
+
+
+def test_cost_ordered_dispatch_skips_paid_requests_for_failed_keys():
+    pairs = pd.DataFrame(
+        {
+            Fields.ORIGIN: ["51.1, 0.1", "52.2, 0.2", "53.3, 0.3"],
+            Fields.DESTINATION: ["51.3, 0.3", "51.4, 0.4", "51.5, 0.5"],
+        }
+    )
+    time_instants = [
+        pytz.UTC.localize(datetime(2100, 9, 5, 12, 0)),
+        pytz.UTC.localize(datetime(2100, 9, 5, 13, 0)),
+    ]
+    handlers = {
+        GOOGLE_API: CountingHandler(),
+        TRAVELTIME_API: CountingHandler(fails_south_of=52),
+        OSRM_API: CountingHandler(fails_south_of=53),
+    }
+    store = ResultStore(pairs, time_instants, list(handlers))
+    origins, destinations = parse_pair_coordinates(pairs)
+
+    stats = asyncio.run(
+        dispatch(
+            origins,
+            destinations,
+            time_instants,
+            handlers,
+            Mode.DRIVING,
+            store,
+            ResultCache(),
+            DepartureDeadlines(handlers),
+            cost_ordered=True,
+        )
+    )
+
+    assert len(handlers[GOOGLE_API].departure_times) == 2
+    assert stats.skipped == {GOOGLE_API: 4}
+    assert store.complete(list(handlers)).tolist() == [
+        [False, False],
+        [False, False],
+        [True, True],
+    ]
@@ -104,3 +104,58 @@ def test_json_config_parse_empty_providers():
         str(excinfo.value)
         == "There should be at least one enabled API provider that's not TravelTime."
     )
+
+
+def test_json_config_parse_uses_provider_default_max_rpm():
+    json = """
+        {
+          "traveltime": {
+            "app-id": "<your-app-id>",
+            "api-key": "<your-api-key>"
+          },
+          "api-providers": [
+            {
+              "name": "openroutes",
+              "enabled": true,
+              "api-key": "<your-api-key>"
+            }
+          ]
+        }
+    """
+
+    providers = parse_json_to_providers(json)
+
+    assert providers.base.max_rpm == 60
+    assert providers.competitors[0].max_rpm == 20
+
+
+def test_json_config_parse_self_hosted_provider():
+    json = """
+        {
+          "traveltime": {
+            "app-id": "<your-app-id>",
+            "api-key": "<your-api-key>",
+            "max-rpm": "60"
+          },
+          "api-providers": [
+            {
+              "name": "osrm",
+              "enabled": true,
+              "api-key": "not-needed!",
+              "max-rpm": "unlimited",
+              "base-url": "http://localhost:5000"
+            }
+          ]
+        }
+    """
+
+    providers = parse_json_to_providers(json)
+
+    assert providers.competitors == [
+        Provider(
+            name="osrm",
+            max_rpm=None,
+            credentials=Credentials("not-needed!"),
+            base_url="http://localhost:5000",
+        )
+    ]
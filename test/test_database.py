@@ -0,0 +1,81 @@
+import pandas as pd
+
+from traveltime_google_comparison.analysis import (
+    calculate_differences,
+    to_long_results,
+)
+from traveltime_google_comparison.collect import GOOGLE_API, TRAVELTIME_API, Fields
+from traveltime_google_comparison.config import Provider, Providers
+from traveltime_google_comparison.database import RunInfo, append_run, query_trends
+from traveltime_google_comparison.requests.traveltime_credentials import (
+    Credentials,
+)
+
+PROVIDERS = Providers(
+    base=Provider(
+        name="traveltime",
+        max_rpm=60,
+        credentials=Credentials(app_id="test", api_key="test"),
+    ),
+    competitors=[Provider(name="google", max_rpm=60, credentials=Credentials("test"))],
+)
+
+
+def run_results(departure_times, google_travel_times):
+    results = pd.DataFrame(
+        {
+            Fields.ORIGIN: ["51.1, 0.1"] * len(departure_times),
+            Fields.DESTINATION: ["51.2, 0.2"] * len(departure_times),
+            Fields.DEPARTURE_TIME: departure_times,
+            Fields.TRAVEL_TIME[TRAVELTIME_API]: [100] * len(departure_times),
+            Fields.TRAVEL_TIME[GOOGLE_API]: google_travel_times,
+        }
+    )
+    return to_long_results(calculate_differences(results, PROVIDERS), PROVIDERS)
+
+
+def test_query_trends_aggregates_runs_per_period(tmp_path):
+    database_file = str(tmp_path / "runs.db")
+    append_run(
+        database_file,
+        run_results(
+            ["2024-01-01 09:00:00+0100", "2024-01-01 10:00:00+0100"], [100, 200]
+        ),
+        RunInfo(input="uk.csv", mode="driving"),
+    )
+    append_run(
+        database_file,
+        run_results(["2024-01-02 09:00:00+0100"], [125]),
+        RunInfo(input="us.csv", mode="driving"),
+    )
+
+    trends = query_trends(database_file, 0.9, "day")
+
+    assert trends["period"].tolist() == ["2024-01-01", "2024-01-02"]
+    assert trends["count"].tolist() == [2, 1]
+    assert trends["mean"].tolist() == [25.0, 20.0]
+    assert trends["quantile"].tolist() == [50.0, 20.0]
+
+
+def test_query_trends_filters_by_departure_time_and_input(tmp_path):
+    database_file = str(tmp_path / "runs.db")
+    append_run(
+        database_file,
+        run_results(
+            ["2024-01-01 09:00:00+0000", "2024-01-08 09:00:00+0000"], [100, 200]
+        ),
+        RunInfo(input="uk.csv", mode="driving"),
+    )
+    append_run(
+        database_file,
+        run_results(["2024-01-08 09:00:00+0000"], [125]),
+        RunInfo(input="us.csv", mode="driving"),
+    )
+
+    trends = query_trends(
+        database_file, 0.9, "month", start="2024-01-05", input_name="uk.csv"
+    )
+
+    assert trends["count"].tolist() == [1]
+    assert trends["mean"].tolist() == [50.0]
+    assert query_trends(database_file, 0.9, "week", providers=["tomtom"]).empty
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+
+from traveltime_google_comparison.collect import Fields
+from traveltime_google_comparison.generate import (
+    SpatialGrid,
+    generate_pairs,
+    rank_within_groups,
+)
+from traveltime_google_comparison.geo import haversine_km, parse_coordinates_column
+
+rng = np.random.default_rng(0)
+POINTS = pd.DataFrame(
+    {"lat": 51 + rng.random(10_000) * 0.5, "lng": -0.5 + rng.random(10_000) * 0.8}
+)
+
+
+def distances(pairs: pd.DataFrame) -> np.ndarray:
+    origin_lat, origin_lng = parse_coordinates_column(pairs[Fields.ORIGIN])
+    destination_lat, destination_lng = parse_coordinates_column(
+        pairs[Fields.DESTINATION]
+    )
+    return haversine_km(origin_lat, origin_lng, destination_lat, destination_lng)
+
+
+def test_generate_pairs_respects_distance_bands():
+    pairs = generate_pairs(POINTS, 3000, [1, 5, 20], seed=1)
+
+    counts, _ = np.histogram(distances(pairs), [1, 5, 20])
+    assert len(pairs) == 3000
+    assert counts.tolist() == [1500, 1500]
+
+
+def test_generate_pairs_does_not_repeat_pairs():
+    pairs = generate_pairs(POINTS, 2000, [0, 10], seed=1)
+    assert not pairs.duplicated().any()
+
+
+def test_generate_pairs_caps_pairs_per_cell():
+    pairs = generate_pairs(
+        POINTS, 2000, [0, 10], max_pairs_per_cell=1, spread_cell_size_km=5, seed=1
+    )
+
+    origin_lat, origin_lng = parse_coordinates_column(pairs[Fields.ORIGIN])
+    grid = SpatialGrid(POINTS["lat"].to_numpy(), POINTS["lng"].to_numpy(), 5)
+    cell_x, cell_y = grid.cells(origin_lat, origin_lng)
+    assert 0 < len(pairs) <= len(grid.cell_keys)
+    assert not pd.DataFrame({"x": cell_x, "y": cell_y}).duplicated().any()
+
+
+def test_rank_within_groups():
+    groups = np.array([3, 1, 3, 3, 1, 2])
+    assert rank_within_groups(groups).tolist() == [0, 0, 1, 2, 1, 0]
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from traveltime_google_comparison.geo import (
+    format_coordinates_column,
+    haversine_km,
+    parse_coordinates_column,
+)
+
+
+def test_haversine_km_between_london_and_paris():
+    distance = haversine_km(
+        np.array([51.5074]),
+        np.array([-0.1278]),
+        np.array([48.8566]),
+        np.array([2.3522]),
+    )
+    assert distance[0] == pytest.approx(343.5, abs=0.5)
+
+
+def test_haversine_km_for_identical_points_is_zero():
+    assert haversine_km(51.5, -0.1, 51.5, -0.1) == 0
+
+
+def test_parse_coordinates_column_with_spaces():
+    lat, lng = parse_coordinates_column(pd.Series(["51.4614, -0.1120", " 52.2 ,0.1 "]))
+    assert lat.tolist() == [51.4614, 52.2]
+    assert lng.tolist() == [-0.1120, 0.1]
+
+
+def test_parse_coordinates_column_wrong_format():
+    with pytest.raises(ValueError):
+        parse_coordinates_column(pd.Series(["51.4614,-0.1120,-122.4194"]))
+
+
+def test_format_coordinates_column_round_trips():
+    coordinates = pd.Series(["52.200400622501455, 0.1082577055247136"])
+    lat, lng = parse_coordinates_column(coordinates)
+    assert format_coordinates_column(lat, lng).tolist() == coordinates.tolist()
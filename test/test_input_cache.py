@@ -0,0 +1,56 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from traveltime_google_comparison.collect import (
+    COORDINATE_COLUMNS,
+    Fields,
+    parse_pair_coordinates,
+)
+from traveltime_google_comparison.input_cache import (
+    open_compiled_input,
+    read_input,
+)
+
+
+def write_input(path, origins, destinations):
+    pd.DataFrame({Fields.ORIGIN: origins, Fields.DESTINATION: destinations}).to_csv(
+        path, index=False
+    )
+
+
+def test_read_input_compiles_once_and_memory_maps_later_runs(tmp_path):
+    input_path = str(tmp_path / "input.csv")
+    cache_dir = str(tmp_path / "cache")
+    write_input(input_path, ["51.1,0.1", "51.2, 0.2"], ["51.3, 0.3", "51.4,0.4"])
+
+    assert open_compiled_input(input_path, cache_dir) is None
+    compiled = read_input(input_path, cache_dir)
+    assert isinstance(open_compiled_input(input_path, cache_dir), np.memmap)
+    cached = read_input(input_path, cache_dir)
+
+    pd.testing.assert_frame_equal(compiled, cached)
+    assert cached[Fields.ORIGIN].tolist() == ["51.1,0.1", "51.2, 0.2"]
+    assert cached[COORDINATE_COLUMNS].to_numpy().tolist() == [
+        [51.1, 0.1, 51.3, 0.3],
+        [51.2, 0.2, 51.4, 0.4],
+    ]
+
+    origins, destinations = parse_pair_coordinates(cached)
+    assert (origins[1].lat, origins[1].lng) == (51.2, 0.2)
+    assert (destinations[0].lat, destinations[0].lng) == (51.3, 0.3)
+
+
+def test_compiled_input_is_rebuilt_when_input_changes(tmp_path):
+    input_path = str(tmp_path / "input.csv")
+    cache_dir = str(tmp_path / "cache")
+    write_input(input_path, ["51.1, 0.1"], ["51.3, 0.3"])
+    read_input(input_path, cache_dir)
+
+    write_input(input_path, ["51.1, 0.1", "51.2, 0.2"], ["51.3, 0.3", "51.4, 0.4"])
+    stat = os.stat(input_path)
+    os.utime(input_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert open_compiled_input(input_path, cache_dir) is None
+    assert len(read_input(input_path, cache_dir)) == 2
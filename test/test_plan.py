@@ -0,0 +1,141 @@
+from dataclasses import replace
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from traveltime_google_comparison.collect import Fields
+from traveltime_google_comparison.config import Mode, Provider, Providers
+from traveltime_google_comparison.plan import (
+    calculate_pair_statistics,
+    create_plan,
+    find_deadline_misses,
+    format_duration,
+)
+from traveltime_google_comparison.requests import registry
+from traveltime_google_comparison.requests.traveltime_credentials import (
+    Credentials,
+)
+
+PROVIDERS = Providers(
+    base=Provider(
+        name="traveltime",
+        max_rpm=60,
+        credentials=Credentials(app_id="test", api_key="test"),
+    ),
+    competitors=[Provider(name="google", max_rpm=30, credentials=Credentials("test"))],
+)
+
+DATA = pd.DataFrame(
+    {
+        Fields.ORIGIN: ["51.0, 0.1", "51.1, 0.2", "51.2, 0.3"],
+        Fields.DESTINATION: ["51.3, 0.4", "51.4, 0.5", "51.5, 0.6"],
+    }
+)
+
+TIME_INSTANTS = [datetime(2023, 9, 5, 12, 0), datetime(2023, 9, 5, 13, 0)]
+
+
+def test_create_plan_counts_requests_and_wall_time_per_provider():
+    plans = {
+        plan.name: plan
+        for plan in create_plan(DATA, TIME_INSTANTS, PROVIDERS, Mode.DRIVING)
+    }
+
+    assert plans["google"].requests == 6
+    assert plans["google"].billing_units == 6
+    assert plans["google"].wall_time == timedelta(seconds=12)
+    assert plans["traveltime"].wall_time == timedelta(seconds=6)
+
+
+def test_create_plan_uses_matrix_batching_when_supported(monkeypatch):
+    google_spec = registry.get_provider_spec("google")
+    monkeypatch.setitem(
+        registry._registry,
+        "google",
+        replace(google_spec, max_batch_size={Mode.DRIVING: 2}, one_to_many=False),
+    )
+
+    plans = {
+        plan.name: plan
+        for plan in create_plan(DATA, TIME_INSTANTS, PROVIDERS, Mode.DRIVING)
+    }
+
+    assert plans["google"].requests == 6
+    assert plans["google"].batched_requests == 4
+    assert plans["traveltime"].batched_requests == 2
+
+
+def test_create_plan_batches_one_to_many_providers_per_origin():
+    data = pd.DataFrame(
+        {
+            Fields.ORIGIN: ["51.0, 0.1", "51.0, 0.1", "51.0, 0.1", "51.1, 0.2"],
+            Fields.DESTINATION: ["51.3, 0.4", "51.4, 0.5", "51.5, 0.6", "51.3, 0.4"],
+        }
+    )
+
+    plans = {
+        plan.name: plan
+        for plan in create_plan(data, TIME_INSTANTS, PROVIDERS, Mode.DRIVING)
+    }
+
+    assert plans["google"].requests == 8
+    assert plans["google"].batched_requests == 4
+
+
+def test_create_plan_requests_time_invariant_providers_once_per_pair():
+    providers = Providers(
+        base=PROVIDERS.base,
+        competitors=[Provider(name="osrm", max_rpm=None, credentials=Credentials(""))],
+    )
+
+    plans = {
+        plan.name: plan
+        for plan in create_plan(DATA, TIME_INSTANTS, providers, Mode.DRIVING)
+    }
+
+    assert plans["osrm"].requests == 3
+    assert plans["osrm"].batched_requests == 1
+    assert plans["traveltime"].requests == 6
+
+
+def test_calculate_pair_statistics():
+    data = pd.DataFrame(
+        {
+            Fields.ORIGIN: ["51.0, 0.1", "51.0,0.1", "51.3, 0.4", "51.1, 0.2"],
+            Fields.DESTINATION: ["51.3, 0.4", "51.4, 0.5", "51.0, 0.1", "51.4, 0.5"],
+        }
+    )
+
+    statistics = calculate_pair_statistics(data)
+
+    assert statistics.pairs == 4
+    assert statistics.shared_origin_pairs == 2
+    assert statistics.shared_destination_pairs == 2
+    assert statistics.symmetric_pairs == 2
+
+
+def test_find_deadline_misses_reports_first_late_departure_time():
+    data = pd.DataFrame(
+        {
+            Fields.ORIGIN: [f"51.{index:02d}, 0.1" for index in range(60)],
+            Fields.DESTINATION: ["51.3, 0.4"] * 60,
+        }
+    )
+    now = datetime(2023, 9, 5, 11, 59)
+
+    misses = find_deadline_misses(
+        data,
+        [datetime(2023, 9, 5, 12, 0), datetime(2023, 9, 5, 13, 0)],
+        PROVIDERS,
+        Mode.DRIVING,
+        now,
+    )
+
+    assert len(misses) == 1
+    assert misses[0].name == "google"
+    assert misses[0].departure_time == datetime(2023, 9, 5, 12, 0)
+    assert misses[0].finish_time == datetime(2023, 9, 5, 12, 1)
+
+
+def test_format_duration():
+    assert format_duration(timedelta(seconds=3725.2)) == "1h 02m 06s"
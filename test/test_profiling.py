@@ -0,0 +1,43 @@
+import os
+
+import pandas as pd
+
+from traveltime_google_comparison import profiling
+from traveltime_google_comparison.profiling import Profiler
+
+
+def test_stage_does_nothing_without_active_profiler():
+    with profiling.stage(profiling.READ_INPUT):
+        pass
+
+
+def test_profiler_writes_stage_report_and_stack_dump(tmp_path):
+    output_dir = str(tmp_path / "profile")
+    profiler = Profiler(output_dir, trace_memory=True, cprofile=True)
+
+    profiling.enable(profiler)
+    try:
+        for _ in range(2):
+            with profiling.stage(profiling.BUILD_RESULTS):
+                values = [index for index in range(100_000)]
+    finally:
+        profiling.disable()
+
+    stages = pd.read_csv(os.path.join(output_dir, profiling.STAGES_FILE))
+    assert stages["stage"].tolist() == [profiling.BUILD_RESULTS]
+    assert stages["calls"].tolist() == [2]
+    assert stages["allocated_bytes"].iloc[0] > 0
+    assert len(values) == 100_000
+    assert os.path.exists(os.path.join(output_dir, profiling.STACKS_FILE))
+    assert os.path.exists(os.path.join(output_dir, profiling.CPROFILE_FILE))
+
+
+def test_stack_sampler_writes_folded_stacks(tmp_path):
+    sampler = profiling.StackSampler(thread_id=0, interval=1)
+    sampler.stacks["main (main.py:1);run (main.py:10)"] = 3
+    file_path = str(tmp_path / "stacks.folded")
+
+    sampler.write(file_path)
+
+    with open(file_path) as file:
+        assert file.read() == "main (main.py:1);run (main.py:10) 3\n"
@@ -0,0 +1,85 @@
+import argparse
+import asyncio
+
+import numpy as np
+import pandas as pd
+
+from traveltime_google_comparison.collect import GOOGLE_API, TRAVELTIME_API, Fields
+from traveltime_google_comparison.config import Mode
+from traveltime_google_comparison.requests.base_handler import (
+    BaseRequestHandler,
+    RequestResult,
+    create_async_limiter,
+)
+from traveltime_google_comparison.sampling import (
+    collect_sampled_travel_times,
+    quantile_confidence_interval,
+)
+
+
+class FakeHandler(BaseRequestHandler):
+    def __init__(self, travel_time):
+        self.travel_time = travel_time
+        self.requests = 0
+        self._rate_limiter = create_async_limiter(None)
+
+    async def send_request(self, origin, destination, departure_time, mode):
+        self.requests += 1
+        return RequestResult(self.travel_time(origin))
+
+    async def send_batch_request(self, origins, destinations, departure_time, mode):
+        self.requests += 1
+        return [RequestResult(self.travel_time(origin)) for origin in origins]
+
+
+def test_quantile_confidence_interval_brackets_the_quantile():
+    values = np.arange(1, 1001, dtype=np.float64)
+
+    low, high = quantile_confidence_interval(values, 0.9)
+
+    assert low < 900 < high
+    assert high - low < 50
+
+
+def test_quantile_confidence_interval_is_unbounded_for_few_values():
+    assert quantile_confidence_interval(np.array([1.0, 2.0]), 0.9) == (
+        -np.inf,
+        np.inf,
+    )
+
+
+def test_collect_sampled_travel_times_stops_once_converged(tmp_path):
+    pairs = 500
+    data = pd.DataFrame(
+        {
+            Fields.ORIGIN: [f"51.{index:03d}, 0.1" for index in range(pairs)],
+            Fields.DESTINATION: ["52.0, 0.2"] * pairs,
+        }
+    )
+    args = argparse.Namespace(
+        date="2100-01-01",
+        start_time="08:00",
+        end_time="09:00",
+        interval=60,
+        time_zone_id="Europe/London",
+        mode=Mode.DRIVING,
+        output=str(tmp_path / "output.csv"),
+        target_ci_width=2.0,
+        sample_round_size=100,
+        sample_seed=42,
+        cost_ordered=False,
+    )
+    handlers = {
+        GOOGLE_API: FakeHandler(lambda origin: 100),
+        TRAVELTIME_API: FakeHandler(lambda origin: 105),
+    }
+
+    results = asyncio.run(
+        collect_sampled_travel_times(
+            args, data, handlers, [GOOGLE_API, TRAVELTIME_API], 0.9
+        )
+    )
+
+    assert len(results) == 100
+    assert results[Fields.TRAVEL_TIME[GOOGLE_API]].notna().all()
+    assert len(pd.read_csv(args.output)) == 100